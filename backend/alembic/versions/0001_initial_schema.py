@@ -0,0 +1,91 @@
+"""Initial schema (tables as originally created by Base.metadata.create_all)
+
+Databases created before migrations existed already have this schema.
+app.database.migrate_db stamps them at 0001 before upgrading; with the CLI,
+run `alembic stamp 0001` and then `alembic upgrade head`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+DEPTH_PREFERENCE = sa.Enum("SUN_ONLY", "SUN_MOON_RISING", "FULL_CHART", name="depthpreference")
+RELATIONSHIP_TAG = sa.Enum("FRIEND", "PARTNER", "FAMILY", "COWORKER", "CRUSH", "EX", name="relationshiptag")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("hashed_password", sa.String(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("birthdate", sa.Date(), nullable=False),
+        sa.Column("birth_time", sa.String(), nullable=True),
+        sa.Column("birth_location", sa.String(), nullable=True),
+        sa.Column("depth_preference", DEPTH_PREFERENCE, nullable=False),
+        sa.Column("natal_chart_data", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "contacts",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("user_id", sa.String(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("birthdate", sa.Date(), nullable=False),
+        sa.Column("birth_time", sa.String(), nullable=True),
+        sa.Column("birth_location", sa.String(), nullable=True),
+        sa.Column("relationship_tag", RELATIONSHIP_TAG, nullable=False),
+        sa.Column("natal_chart_data", sa.JSON(), nullable=True),
+        sa.Column("notes", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_contacts_user_id", "contacts", ["user_id"])
+
+    op.create_table(
+        "compatibilities",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("user_id", sa.String(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("contact_id", sa.String(), sa.ForeignKey("contacts.id"), nullable=False, unique=True),
+        sa.Column("soulmate_score", sa.Integer(), nullable=False),
+        sa.Column("compatibility_category", sa.String(), nullable=False),
+        sa.Column("compatibility_data", sa.JSON(), nullable=False),
+        sa.Column("synastry_story", sa.Text(), nullable=True),
+        sa.Column("last_calculated", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_compatibilities_user_id", "compatibilities", ["user_id"])
+
+    op.create_table(
+        "groups",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("user_id", sa.String(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("member_contact_ids", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_groups_user_id", "groups", ["user_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_groups_user_id", table_name="groups")
+    op.drop_table("groups")
+    op.drop_index("ix_compatibilities_user_id", table_name="compatibilities")
+    op.drop_table("compatibilities")
+    op.drop_index("ix_contacts_user_id", table_name="contacts")
+    op.drop_table("contacts")
+    op.drop_index("ix_users_email", table_name="users")
+    op.drop_table("users")
+    RELATIONSHIP_TAG.drop(op.get_bind(), checkfirst=True)
+    DEPTH_PREFERENCE.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,20 @@
+"""Index contacts on (user_id, name, id) for keyset pagination
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_contacts_user_name_id", "contacts", ["user_id", "name", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_contacts_user_name_id", table_name="contacts")
@@ -0,0 +1,25 @@
+"""Covering index on compatibilities for the top-matches leaderboard
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_compatibilities_user_score",
+        "compatibilities",
+        ["user_id", sa.text("soulmate_score DESC"), "contact_id", "compatibility_category"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_compatibilities_user_score", table_name="compatibilities")
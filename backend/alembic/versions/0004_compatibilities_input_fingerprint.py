@@ -0,0 +1,23 @@
+"""Fingerprint of the inputs each stored compatibility was calculated from
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing rows stay NULL and are recalculated the next time they are read
+    op.add_column("compatibilities", sa.Column("input_fingerprint", sa.String(length=16), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("compatibilities") as batch_op:
+        batch_op.drop_column("input_fingerprint")
@@ -9,6 +9,40 @@ class Settings(BaseSettings):
     secret_key: str = "cosmic-secret-key-change-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 60 * 24 * 7  # 7 days
+    user_cache_ttl_seconds: float = 30.0
+    user_cache_max_size: int = 1024
+    password_hash_rounds: int = 12
+    password_hash_workers: int = 4
+    password_hash_max_queue: int = 64
+
+    # Connection pool (file-backed SQLite and Postgres)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800  # seconds; keep below server/proxy idle timeouts
+    db_pool_pre_ping: bool = True
+
+    # SQLite pragmas applied to every new connection
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_cache_size_kib: int = 16384
+    sqlite_mmap_size: int = 128 * 1024 * 1024
+
+    # Send per-request phase timings to clients; histograms are kept regardless
+    server_timing_header: bool = True
+    # Log a request as a likely N+1 when one statement shape runs more often than this
+    n_plus_one_threshold: int = 10
+    # Bearer token required by /metrics; while empty the endpoint is not served
+    metrics_token: str = ""
+
+    # Startup steps, off by default so workers boot without touching the schema:
+    # deploys run `alembic upgrade head` (and `python -m app.mock.seed_data`
+    # for demo data) as a release step. For local development put
+    # DB_MIGRATE_ON_STARTUP=true and SEED_ON_STARTUP=true in .env; they then
+    # run under a cross-process lock.
+    db_migrate_on_startup: bool = False
+    seed_on_startup: bool = False
 
     @field_validator("database_url", mode="before")
     @classmethod
@@ -1,13 +1,121 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.config import settings
+from app.services.forecast import spotlight_rank_value
+from app.services.timing import phase, record, record_statement
 
 
 class Base(DeclarativeBase):
     pass
 
 
-engine = create_async_engine(settings.database_url, echo=settings.debug)
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._wait_lock = threading.Lock()
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - start
+            record("db_wait", waited)
+            with self._wait_lock:
+                self.wait_count += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+
+
+def _engine_options(database_url: str) -> dict:
+    """Pool settings for the configured backend.
+
+    In-memory SQLite keeps SQLAlchemy's default single-connection pool.
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": TimedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+engine = create_async_engine(
+    settings.database_url, echo=settings.debug, **_engine_options(settings.database_url)
+)
+
+
+@event.listens_for(engine.sync_engine, "connect")
+def _configure_sqlite_connection(dbapi_connection, connection_record):
+    if engine.dialect.name != "sqlite":
+        return
+
+    # WAL lets readers proceed alongside a writer; busy_timeout makes writers
+    # wait for the lock instead of failing with "database is locked".
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+    cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+    cursor.execute(f"PRAGMA cache_size={-int(settings.sqlite_cache_size_kib)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+    cursor.close()
+
+    # SQLite has no md5(); provide the functions our queries compile to
+    dbapi_connection.create_function("spotlight_rank", 2, spotlight_rank_value, deterministic=True)
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the statement's own execution context: one that raises never
+    # reaches after_cursor_execute, and must not leave a start time behind on
+    # the pooled connection for the next statement to pick up
+    context._query_start = time.perf_counter()
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+    record_statement(statement, time.perf_counter() - context._query_start, executemany)
+
+
+def pool_stats() -> dict:
+    """Occupancy and checkout wait times for the engine's connection pool."""
+    pool = engine.sync_engine.pool
+    stats = {"pool": type(pool).__name__, "status": pool.status()}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+        })
+    if isinstance(pool, TimedQueuePool):
+        stats.update({
+            "waits": pool.wait_count,
+            "wait_seconds_total": round(pool.wait_total, 6),
+            "wait_seconds_max": round(pool.wait_max, 6),
+        })
+    return stats
+
 
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
@@ -17,9 +125,70 @@ async def get_db():
         try:
             yield session
         finally:
-            await session.close()
+            # Returning the connection may roll back an open transaction
+            with phase("db"):
+                await session.close()
+
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+
+# Arbitrary constant identifying the startup lock among Postgres advisory locks
+STARTUP_LOCK_KEY = 0x436F736D
+
+
+@asynccontextmanager
+async def startup_lock():
+    """Cross-process lock so only one worker migrates/seeds at a time.
+
+    Postgres uses a session-level advisory lock; SQLite uses a flock on a
+    file next to the database (or in the temp dir for in-memory databases).
+    """
+    if engine.dialect.name == "postgresql":
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": STARTUP_LOCK_KEY})
+            try:
+                yield
+            finally:
+                await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": STARTUP_LOCK_KEY})
+        return
+
+    import fcntl
+
+    database = engine.url.database
+    if database and database != ":memory:":
+        lock_path = f"{database}.startup.lock"
+    else:
+        lock_path = os.path.join(tempfile.gettempdir(), "cosmiccircle.startup.lock")
+    with open(lock_path, "w") as lock_file:
+        await asyncio.to_thread(fcntl.flock, lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+# Revision matching the schema Base.metadata.create_all built before migrations
+BASELINE_REVISION = "0001"
+
+
+def _upgrade(connection, revision: str):
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(str(ALEMBIC_INI))
+    config.attributes["connection"] = connection
+    config.attributes["configure_logger"] = False
+    inspector = inspect(connection)
+    if inspector.has_table("users") and not inspector.has_table("alembic_version"):
+        command.stamp(config, BASELINE_REVISION)
+    command.upgrade(config, revision)
+
 
+async def migrate_db(revision: str = "head"):
+    """Apply Alembic migrations on the app's own engine.
 
-async def init_db():
+    A database created by create_all (before migrations existed) has the
+    tables but no version; it is stamped at the baseline revision first.
+    """
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_upgrade, revision)
@@ -1,15 +1,37 @@
+import logging
+import time
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import init_db
-from app.routers import auth, users, contacts, compatibility, stories
+from app.config import settings
+from app.database import migrate_db, startup_lock
+from app.responses import ORJSONResponse
+from app.services.timing import ServerTimingMiddleware
+from app.routers import auth, users, contacts, compatibility, stories, groups, metrics
 from app.mock.seed_data import seed
 
+# uvicorn/gunicorn configure this logger, so startup timings show up by default
+logger = logging.getLogger("uvicorn.error")
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await init_db()
-    await seed()
+    timings = {}
+    start = time.perf_counter()
+    if settings.db_migrate_on_startup or settings.seed_on_startup:
+        phase = time.perf_counter()
+        async with startup_lock():
+            timings["lock"] = time.perf_counter() - phase
+            if settings.db_migrate_on_startup:
+                phase = time.perf_counter()
+                await migrate_db()
+                timings["migrate"] = time.perf_counter() - phase
+            if settings.seed_on_startup:
+                phase = time.perf_counter()
+                await seed()
+                timings["seed"] = time.perf_counter() - phase
+    timings["total"] = time.perf_counter() - start
+    logger.info("Startup phases: %s", ", ".join(f"{k}={v * 1000:.1f}ms" for k, v in timings.items()))
     yield
 
 
@@ -17,6 +39,7 @@ app = FastAPI(
     title="CosmicCircle API",
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     redirect_slashes=False,  # Prevent 307 redirects that break iOS fetch auth headers
 )
 
@@ -26,6 +49,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Server-Timing"],
+)
+app.add_middleware(
+    ServerTimingMiddleware,
+    header=settings.server_timing_header,
+    n_plus_one_threshold=settings.n_plus_one_threshold,
 )
 
 app.include_router(auth.router)
@@ -33,6 +62,8 @@ app.include_router(users.router)
 app.include_router(contacts.router)
 app.include_router(compatibility.router)
 app.include_router(stories.router)
+app.include_router(groups.router)
+app.include_router(metrics.router)
 
 
 @app.get("/")
@@ -0,0 +1,59 @@
+"""One-shot migration rewriting stored natal charts into the compact format.
+
+Run with: python -m app.mock.compact_charts
+"""
+import asyncio
+from sqlalchemy import JSON, bindparam, select, type_coerce, update
+from app.database import engine
+from app.models.user import User
+from app.models.contact import Contact
+from app.mock.natal_charts import compact_chart
+
+BATCH_SIZE = 500
+
+
+async def compact_table(model) -> int:
+    table = model.__table__
+    # Read the raw JSON so legacy rows are seen as stored, not hydrated
+    raw_chart = type_coerce(table.c.natal_chart_data, JSON)
+    stmt = (
+        update(table)
+        .where(table.c.id == bindparam("row_id"))
+        .values(natal_chart_data=bindparam("chart"))
+    )
+
+    rewritten = 0
+    last_id = ""
+    while True:
+        # Keyset pages, each read and rewritten in its own short transaction,
+        # so only one batch of charts is held at a time
+        async with engine.begin() as conn:
+            result = await conn.execute(
+                select(table.c.id, raw_chart)
+                .where(table.c.natal_chart_data.is_not(None), table.c.id > last_id)
+                .order_by(table.c.id)
+                .limit(BATCH_SIZE)
+            )
+            rows = result.all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            pending = [
+                {"row_id": row_id, "chart": compact_chart(chart)}
+                for row_id, chart in rows
+                if chart and "v" not in chart
+            ]
+            if pending:
+                await conn.execute(stmt, pending)
+        rewritten += len(pending)
+    return rewritten
+
+
+async def compact_charts():
+    for model in (User, Contact):
+        count = await compact_table(model)
+        print(f"Compacted {count} {model.__tablename__} charts.")
+
+
+if __name__ == "__main__":
+    asyncio.run(compact_charts())
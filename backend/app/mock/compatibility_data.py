@@ -1,10 +1,13 @@
 import hashlib
+from functools import lru_cache
+import numpy as np
 from app.services.astrology import (
-    get_element, get_aspect, ELEMENT_COMPATIBILITY, ALL_SIGNS,
+    get_element, get_aspect, ELEMENT_COMPATIBILITY, ALL_SIGNS, SIGN_INDEX,
 )
-from app.mock.interpretations import (
+from app.mock.corpus import (
     SIGN_PAIR_STRENGTHS, SIGN_PAIR_CHALLENGES, ASPECT_DESCRIPTIONS,
 )
+from app.services.timing import timed
 
 
 def _pair_seed(sign1: str, sign2: str) -> int:
@@ -21,114 +24,309 @@ def _get_pair_key(sign1: str, sign2: str) -> tuple:
     return None
 
 
+SUB_SCORE_CATEGORIES = ["emotional", "intellectual", "physical", "spiritual", "communication"]
+
+DEPTH_PREFERENCES = ("sun_only", "sun_moon_rising", "full_chart")
+
+# Bump whenever scoring or the result shape changes; stored results whose
+# fingerprint was taken under another version are recalculated on next read.
+ENGINE_VERSION = 1
+
+# Placements (user side, contact side) each depth reads; nothing else in the
+# charts affects the result
+FINGERPRINT_PLANETS = {
+    "sun_only": (("sun",), ("sun",)),
+    "sun_moon_rising": (("sun", "moon"), ("sun", "moon")),
+    "full_chart": (("sun", "moon", "venus"), ("sun", "moon", "mars")),
+}
+
+ASPECT_MODIFIERS = {
+    "conjunction": 10, "trine": 12, "sextile": 8,
+    "square": -5, "opposition": -3, "semi-sextile": 3, "quincunx": -2,
+}
+
+COMPATIBILITY_CATEGORIES = [
+    "twin_flame", "romantic_soulmate", "platonic_soulmate", "karmic_teacher", "cosmic_challenger",
+]
+
+ELEMENTS = ["fire", "earth", "air", "water"]
+
+KEY_ASPECT_PAIRS = [("sun", "sun"), ("moon", "moon"), ("venus", "mars")]
+
+
+def _categorize(overall: int) -> str:
+    if overall >= 85:
+        return "twin_flame"
+    elif overall >= 75:
+        return "romantic_soulmate"
+    elif overall >= 60:
+        return "platonic_soulmate"
+    elif overall >= 45:
+        return "karmic_teacher"
+    return "cosmic_challenger"
+
+
+class CompatibilityEngine:
+    """Dense lookup tables for sign-pair compatibility.
+
+    Every score generate_mock_compatibility can produce is a function of the
+    sun sign pair, the moon element pair, whether Venus/Mars form a harmonious
+    aspect, and the depth preference. All of those are enumerated once per
+    depth, on its first use, so that scoring a pair is a handful of list
+    lookups.
+
+    Key aspects, strengths and challenges (the corpus text) are looked up on
+    first use and cached per sign pair, so importing the engine decodes none
+    of it.
+
+    Nested lists/dicts in the results are shared between calls and must be
+    treated as read-only.
+    """
+
+    def __init__(self):
+        self._sign_element = [ELEMENTS.index(get_element(s)) for s in ALL_SIGNS]
+
+        # Per sun pair: aspect, base score and the pre-depth sub-scores
+        self._sun_aspect = []
+        sun_base = []
+        sun_sub_scores = []
+        for s1 in ALL_SIGNS:
+            for s2 in ALL_SIGNS:
+                aspect = get_aspect(s1, s2)
+                base = ELEMENT_COMPATIBILITY.get((get_element(s1), get_element(s2)), 60)
+                base += ASPECT_MODIFIERS.get(aspect, 0)
+                seed = _pair_seed(s1, s2)
+                subs = [
+                    max(20, min(100, base + ((seed >> (i * 4)) % 21) - 10))
+                    for i in range(len(SUB_SCORE_CATEGORIES))
+                ]
+                self._sun_aspect.append(aspect)
+                sun_base.append(base)
+                sun_sub_scores.append(subs)
+
+        # Venus (user) / Mars (contact) bonus by sign pair
+        self._venus_mars_bonus = [
+            get_aspect(s1, s2) in ("conjunction", "trine", "sextile")
+            for s1 in ALL_SIGNS for s2 in ALL_SIGNS
+        ]
+
+        # The per-sign tables as arrays, for vectorized pairwise scoring
+        self._sign_element_array = np.array(self._sign_element, dtype=np.intp)
+        self._venus_mars_array = np.array(self._venus_mars_bonus, dtype=np.intp)
+
+        # Score tables are built per depth on first use (see _table)
+        self._sun_base = sun_base
+        self._sun_sub_scores = sun_sub_scores
+        self._scores = {}
+        self._overall_array = {}
+        self._category_array = {}
+
+    def _table(self, depth: str) -> list[tuple]:
+        """Flat table of (overall, category, sub_scores) for a depth, indexed by
+        sun pair, then moon element pair (4x4), then the venus/mars bonus flag.
+
+        Unknown depths score as sun_only.
+        """
+        if depth not in DEPTH_PREFERENCES:
+            depth = "sun_only"
+        table = self._scores.get(depth)
+        if table is not None:
+            return table
+
+        emotional = SUB_SCORE_CATEGORIES.index("emotional")
+        physical = SUB_SCORE_CATEGORIES.index("physical")
+        table = []
+        for pair in range(len(ALL_SIGNS) ** 2):
+            for el1 in ELEMENTS:
+                for el2 in ELEMENTS:
+                    moon_compat = ELEMENT_COMPATIBILITY.get((el1, el2), 60)
+                    for bonus in (False, True):
+                        base = self._sun_base[pair]
+                        subs = list(self._sun_sub_scores[pair])
+                        if depth in ("sun_moon_rising", "full_chart"):
+                            base = int(base * 0.6 + moon_compat * 0.4)
+                            subs[emotional] = int(subs[emotional] * 0.5 + moon_compat * 0.5)
+                        if depth == "full_chart" and bonus:
+                            base += 5
+                            subs[physical] = min(100, subs[physical] + 10)
+                        overall = max(25, min(98, base))
+                        table.append((
+                            overall,
+                            _categorize(overall),
+                            dict(zip(SUB_SCORE_CATEGORIES, subs)),
+                        ))
+        self._scores[depth] = table
+        self._overall_array[depth] = np.array([entry[0] for entry in table], dtype=np.int16)
+        self._category_array[depth] = np.array(
+            [COMPATIBILITY_CATEGORIES.index(entry[1]) for entry in table], dtype=np.int8,
+        )
+        return table
+
+    def _pair_index(self, sign1: str, sign2: str) -> int:
+        return SIGN_INDEX[sign1] * len(ALL_SIGNS) + SIGN_INDEX[sign2]
+
+    def _score_index(self, user_chart: dict, contact_chart: dict, depth: str) -> tuple[int, str, str]:
+        user_sun = user_chart["sun"]["sign"]
+        contact_sun = contact_chart["sun"]["sign"]
+        moon_pair = 0
+        bonus = 0
+        if depth in ("sun_moon_rising", "full_chart"):
+            user_moon = user_chart.get("moon", {}).get("sign", user_sun)
+            contact_moon = contact_chart.get("moon", {}).get("sign", contact_sun)
+            moon_pair = (
+                self._sign_element[SIGN_INDEX[user_moon]] * len(ELEMENTS)
+                + self._sign_element[SIGN_INDEX[contact_moon]]
+            )
+        if depth == "full_chart":
+            user_venus = user_chart.get("venus", {}).get("sign", user_sun)
+            contact_mars = contact_chart.get("mars", {}).get("sign", contact_sun)
+            bonus = int(self._venus_mars_bonus[self._pair_index(user_venus, contact_mars)])
+        sun_pair = self._pair_index(user_sun, contact_sun)
+        index = (sun_pair * len(ELEMENTS) ** 2 + moon_pair) * 2 + bonus
+        return index, user_sun, contact_sun
+
+    def score(self, user_chart: dict, contact_chart: dict, depth_preference: str = "sun_only") -> tuple[int, str]:
+        """Return just (overall_score, category) for a pair of charts."""
+        table = self._table(depth_preference)
+        index, _, _ = self._score_index(user_chart, contact_chart, depth_preference)
+        overall, category, _ = table[index]
+        return overall, category
+
+    @timed("compatibility")
+    def score_matrix(self, charts: list[dict], depth_preference: str = "sun_only") -> tuple[np.ndarray, np.ndarray]:
+        """Score every ordered pair of charts at once.
+
+        Returns (scores, categories) as n x n arrays where [i, j] is the result
+        of scoring charts[i] as the user against charts[j]; categories holds
+        indices into COMPATIBILITY_CATEGORIES. The diagonal is not meaningful.
+        """
+        n = len(ALL_SIGNS)
+        depth = depth_preference if depth_preference in DEPTH_PREFERENCES else "sun_only"
+        self._table(depth)
+
+        def signs(planet: str) -> np.ndarray:
+            return np.fromiter(
+                (SIGN_INDEX[c.get(planet, {}).get("sign", c["sun"]["sign"])] for c in charts),
+                dtype=np.intp, count=len(charts),
+            )
+
+        sun = signs("sun")
+        index = (sun[:, None] * n + sun[None, :]) * len(ELEMENTS) ** 2
+        if depth in ("sun_moon_rising", "full_chart"):
+            moon = self._sign_element_array[signs("moon")]
+            index = index + moon[:, None] * len(ELEMENTS) + moon[None, :]
+        index = index * 2
+        if depth == "full_chart":
+            index = index + self._venus_mars_array[signs("venus")[:, None] * n + signs("mars")[None, :]]
+        return self._overall_array[depth][index], self._category_array[depth][index]
+
+    def compatibility(self, user_chart: dict, contact_chart: dict, depth_preference: str = "sun_only") -> dict:
+        """Return the full compatibility result for a pair of charts."""
+        table = self._table(depth_preference)
+        index, user_sun, contact_sun = self._score_index(user_chart, contact_chart, depth_preference)
+        overall, category, sub_scores = table[index]
+        sun_pair = self._pair_index(user_sun, contact_sun)
+
+        pairs = KEY_ASPECT_PAIRS
+        if depth_preference == "sun_only":
+            pairs = pairs[:1]
+        elif depth_preference == "sun_moon_rising":
+            pairs = pairs[:2]
+        key_aspects = [
+            _describe_aspect(
+                p1, p2,
+                user_chart.get(p1, {}).get("sign", "aries"),
+                contact_chart.get(p2, {}).get("sign", "aries"),
+            )
+            for p1, p2 in pairs
+        ]
+
+        return {
+            "overall_score": overall,
+            "category": category,
+            "sub_scores": dict(sub_scores),
+            "key_aspects": key_aspects,
+            "strengths": _generate_strengths(user_sun, contact_sun, category),
+            "challenges": _generate_challenges(user_sun, contact_sun, category),
+            "sun_aspect": self._sun_aspect[sun_pair],
+            "user_sun": user_sun,
+            "contact_sun": contact_sun,
+        }
+
+    def fingerprint(self, user_chart: dict, contact_chart: dict, depth_preference: str = "sun_only") -> str:
+        """Digest of everything compatibility() reads for this pair and depth.
+
+        Equal fingerprints mean an earlier result is still current.
+        """
+        user_planets, contact_planets = FINGERPRINT_PLANETS.get(depth_preference, FINGERPRINT_PLANETS["full_chart"])
+        parts = [str(ENGINE_VERSION), depth_preference]
+        parts += [str(user_chart.get(p, {}).get("sign")) for p in user_planets]
+        parts += [str(contact_chart.get(p, {}).get("sign")) for p in contact_planets]
+        return hashlib.sha1("|".join(parts).encode()).hexdigest()[:16]
+
+    def compatibility_many(
+        self, user_chart: dict, contact_charts: list[dict], depth_preference: str = "sun_only",
+    ) -> list[dict]:
+        """Score one chart against many, e.g. a user's whole circle."""
+        return [self.compatibility(user_chart, c, depth_preference) for c in contact_charts]
+
+    def compatibility_pairs(
+        self, pairs: list[tuple[dict, dict]], depth_preference: str = "sun_only",
+    ) -> list[dict]:
+        """Score arbitrary (user_chart, contact_chart) pairs in one call."""
+        return [self.compatibility(u, c, depth_preference) for u, c in pairs]
+
+
+@timed("compatibility")
 def generate_mock_compatibility(
     user_chart: dict,
     contact_chart: dict,
     depth_preference: str = "sun_only",
 ) -> dict:
-    user_sun = user_chart["sun"]["sign"]
-    contact_sun = contact_chart["sun"]["sign"]
-
-    # Base score from element compatibility
-    el1 = get_element(user_sun)
-    el2 = get_element(contact_sun)
-    base_score = ELEMENT_COMPATIBILITY.get((el1, el2), 60)
-
-    # Aspect modifier
-    aspect = get_aspect(user_sun, contact_sun)
-    aspect_modifiers = {
-        "conjunction": 10, "trine": 12, "sextile": 8,
-        "square": -5, "opposition": -3, "semi-sextile": 3, "quincunx": -2,
-    }
-    base_score += aspect_modifiers.get(aspect, 0)
-
-    # Sub-scores with variance from pair seed
-    seed = _pair_seed(user_sun, contact_sun)
-    sub_scores = {}
-    categories = ["emotional", "intellectual", "physical", "spiritual", "communication"]
-    for i, cat in enumerate(categories):
-        variance = ((seed >> (i * 4)) % 21) - 10  # -10 to +10
-        sub_scores[cat] = max(20, min(100, base_score + variance))
-
-    # Depth modifiers
-    if depth_preference in ("sun_moon_rising", "full_chart"):
-        user_moon = user_chart.get("moon", {}).get("sign", user_sun)
-        contact_moon = contact_chart.get("moon", {}).get("sign", contact_sun)
-        moon_el1 = get_element(user_moon)
-        moon_el2 = get_element(contact_moon)
-        moon_compat = ELEMENT_COMPATIBILITY.get((moon_el1, moon_el2), 60)
-        base_score = int(base_score * 0.6 + moon_compat * 0.4)
-        sub_scores["emotional"] = int(sub_scores["emotional"] * 0.5 + moon_compat * 0.5)
-
-    if depth_preference == "full_chart":
-        user_venus = user_chart.get("venus", {}).get("sign", user_sun)
-        contact_mars = contact_chart.get("mars", {}).get("sign", contact_sun)
-        venus_mars_aspect = get_aspect(user_venus, contact_mars)
-        if venus_mars_aspect in ("conjunction", "trine", "sextile"):
-            base_score += 5
-            sub_scores["physical"] = min(100, sub_scores["physical"] + 10)
-
-    overall = max(25, min(98, base_score))
-
-    # Determine category
-    if overall >= 85:
-        category = "twin_flame"
-    elif overall >= 75:
-        category = "romantic_soulmate"
-    elif overall >= 60:
-        category = "platonic_soulmate"
-    elif overall >= 45:
-        category = "karmic_teacher"
-    else:
-        category = "cosmic_challenger"
+    return compatibility_engine.compatibility(user_chart, contact_chart, depth_preference)
 
-    # Generate sign-pair specific data
-    key_aspects = _generate_key_aspects(user_chart, contact_chart, depth_preference)
-    strengths = _generate_strengths(user_sun, contact_sun, category)
-    challenges = _generate_challenges(user_sun, contact_sun, category)
 
-    return {
-        "overall_score": overall,
-        "category": category,
-        "sub_scores": sub_scores,
-        "key_aspects": key_aspects,
-        "strengths": strengths,
-        "challenges": challenges,
-        "sun_aspect": aspect,
-        "user_sun": user_sun,
-        "contact_sun": contact_sun,
-    }
+def compatibility_fingerprint(
+    user_chart: dict,
+    contact_chart: dict,
+    depth_preference: str = "sun_only",
+) -> str:
+    return compatibility_engine.fingerprint(user_chart, contact_chart, depth_preference)
+
+
+@timed("compatibility")
+def generate_mock_compatibility_bulk(
+    user_chart: dict,
+    contact_charts: list[dict],
+    depth_preference: str = "sun_only",
+) -> list[dict]:
+    return compatibility_engine.compatibility_many(user_chart, contact_charts, depth_preference)
 
 
-def _generate_key_aspects(user_chart: dict, contact_chart: dict, depth: str) -> list[dict]:
-    aspects = []
-    pairs = [("sun", "sun"), ("moon", "moon"), ("venus", "mars")]
-    if depth == "sun_only":
-        pairs = pairs[:1]
-    elif depth == "sun_moon_rising":
-        pairs = pairs[:2]
-
-    for p1, p2 in pairs:
-        s1 = user_chart.get(p1, {}).get("sign", "aries")
-        s2 = contact_chart.get(p2, {}).get("sign", "aries")
-        asp = get_aspect(s1, s2)
-
-        # Get rich aspect description
-        aspect_data = ASPECT_DESCRIPTIONS.get((p1, p2), {})
-        description = aspect_data.get(asp, "")
-        if not description:
-            # Fallback to a generated description
-            description = f"Your {p1.title()} in {s1.title()} forms a {asp} with their {p2.title()} in {s2.title()}"
-
-        aspects.append({
-            "planet1": p1,
-            "planet2": p2,
-            "sign1": s1,
-            "sign2": s2,
-            "aspect": asp,
-            "description": description,
-        })
-    return aspects
+# Per sign pair: one entry for each key aspect planet pair, and one list of
+# strengths and of challenges for each category
+PAIR_CACHE_SIZE = len(ALL_SIGNS) ** 2 * max(len(KEY_ASPECT_PAIRS), len(COMPATIBILITY_CATEGORIES))
+
+
+@lru_cache(maxsize=PAIR_CACHE_SIZE)
+def _describe_aspect(p1: str, p2: str, s1: str, s2: str) -> dict:
+    asp = get_aspect(s1, s2)
+
+    # Get rich aspect description
+    aspect_data = ASPECT_DESCRIPTIONS.get((p1, p2), {})
+    description = aspect_data.get(asp, "")
+    if not description:
+        # Fallback to a generated description
+        description = f"Your {p1.title()} in {s1.title()} forms a {asp} with their {p2.title()} in {s2.title()}"
+
+    return {
+        "planet1": p1,
+        "planet2": p2,
+        "sign1": s1,
+        "sign2": s2,
+        "aspect": asp,
+        "description": description,
+    }
 
 
 # ──────────────────────────────────────────────────────────────────
@@ -197,6 +395,7 @@ GENERIC_CHALLENGE_TEMPLATES = {
 }
 
 
+@lru_cache(maxsize=PAIR_CACHE_SIZE)
 def _generate_strengths(sign1: str, sign2: str, category: str) -> list[str]:
     # Try sign-pair specific data first
     pair_key = _get_pair_key(sign1, sign2)
@@ -211,6 +410,7 @@ def _generate_strengths(sign1: str, sign2: str, category: str) -> list[str]:
     return templates[start:start + count]
 
 
+@lru_cache(maxsize=PAIR_CACHE_SIZE)
 def _generate_challenges(sign1: str, sign2: str, category: str) -> list[str]:
     # Try sign-pair specific data first
     pair_key = _get_pair_key(sign1, sign2)
@@ -225,3 +425,6 @@ def _generate_challenges(sign1: str, sign2: str, category: str) -> list[str]:
     count = min(2, len(templates))
     start = seed % max(1, len(templates) - count + 1)
     return templates[start:start + count]
+
+
+compatibility_engine = CompatibilityEngine()
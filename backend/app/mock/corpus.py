@@ -0,0 +1,209 @@
+"""Compiled, lazily loaded view of the interpretations corpus.
+
+The corpus is authored as Python literals in app/mock/interpretations.py.
+On first use it is compiled into an indexed binary (interpretations.corpus)
+that each worker memory-maps, so the text pages are shared through the OS
+page cache. A section's index is parsed only when the section is first
+touched, and entries are decoded from the mapped pages on each lookup
+rather than copied into every worker. Rebuild ahead of
+deploys with:
+
+    python -m app.mock.corpus
+
+The artifact records a hash of its source and is rebuilt when stale.
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+
+SOURCE = Path(__file__).with_name("interpretations.py")
+ARTIFACT = Path(__file__).with_name("interpretations.corpus")
+
+SECTIONS = (
+    "PLANET_MEANINGS",
+    "SIGN_PAIR_STRENGTHS",
+    "SIGN_PAIR_CHALLENGES",
+    "ASPECT_DESCRIPTIONS",
+    "DAILY_INSIGHTS",
+    "COSMIC_WEATHER",
+    "DAILY_CONNECTION_PROMPTS",
+)
+
+# Layout: header | directory | entry tables | values, all JSON-encoded.
+# The directory maps section -> [kind, table offset, table length] and each
+# entry table is a list of [key, value offset, value length]. Offsets are
+# relative to the start of their region; tuple keys are stored as lists.
+MAGIC = b"CCORPUS1"
+_HEADER = struct.Struct("<8s32sII")  # magic, sha256 of source, directory length, tables length
+
+
+def _source_digest() -> bytes:
+    return hashlib.sha256(SOURCE.read_bytes()).digest()
+
+
+def _dumps(value) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def compile_corpus() -> bytes:
+    """Serialize every section of app.mock.interpretations into the artifact format."""
+    from app.mock import interpretations
+
+    directory, tables, values = {}, bytearray(), bytearray()
+    for name in SECTIONS:
+        data = getattr(interpretations, name)
+        kind = "list" if isinstance(data, list) else "map"
+        items = enumerate(data) if kind == "list" else data.items()
+        entries = []
+        for key, value in items:
+            raw = _dumps(value)
+            entries.append([list(key) if isinstance(key, tuple) else key, len(values), len(raw)])
+            values += raw
+        table = _dumps(entries)
+        directory[name] = [kind, len(tables), len(table)]
+        tables += table
+
+    raw_directory = _dumps(directory)
+    header = _HEADER.pack(MAGIC, _source_digest(), len(raw_directory), len(tables))
+    return header + raw_directory + bytes(tables) + bytes(values)
+
+
+def build_artifact(path: Path = ARTIFACT) -> bytes:
+    """Compile the corpus and atomically replace the artifact on disk."""
+    data = compile_corpus()
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return data
+
+
+class _Corpus:
+    def __init__(self, buffer):
+        self._buffer = buffer
+        magic, _, directory_length, tables_length = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("not an interpretations corpus")
+        self._tables_base = _HEADER.size + directory_length
+        self._values_base = self._tables_base + tables_length
+        self._directory = json.loads(bytes(buffer[_HEADER.size:self._tables_base]))
+
+    def section(self, name: str):
+        kind, offset, length = self._directory[name]
+        start = self._tables_base + offset
+        entries = json.loads(bytes(self._buffer[start:start + length]))
+        index = {
+            (tuple(key) if isinstance(key, list) else key): (self._values_base + off, size)
+            for key, off, size in entries
+        }
+        return index if kind == "map" else [index[i] for i in range(len(index))]
+
+    def value(self, location: tuple[int, int]):
+        start, size = location
+        return json.loads(bytes(self._buffer[start:start + size]))
+
+
+_lock = threading.Lock()
+_corpus: _Corpus | None = None
+
+
+def _open_artifact() -> _Corpus:
+    digest = _source_digest()
+    try:
+        with open(ARTIFACT, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if _HEADER.unpack_from(buffer, 0)[:2] == (MAGIC, digest):
+            return _Corpus(buffer)
+        buffer.close()
+    except (OSError, ValueError, struct.error):
+        pass
+
+    # Missing or stale: rebuild, falling back to an in-memory copy when the
+    # package directory is read-only
+    try:
+        build_artifact()
+        with open(ARTIFACT, "rb") as f:
+            return _Corpus(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    except OSError:
+        return _Corpus(compile_corpus())
+
+
+def _get_corpus() -> _Corpus:
+    global _corpus
+    if _corpus is None:
+        with _lock:
+            if _corpus is None:
+                _corpus = _open_artifact()
+    return _corpus
+
+
+class _LazySection:
+    def __init__(self, name: str):
+        self._name = name
+        self._index = None
+
+    def _get_index(self):
+        if self._index is None:
+            self._index = _get_corpus().section(self._name)
+        return self._index
+
+    def _load(self, location):
+        # Decoded from the shared pages on every lookup; callers on hot paths
+        # cache what they derive from it (bounded by their own keys)
+        return _get_corpus().value(location)
+
+
+class CorpusMapping(_LazySection, Mapping):
+    """Read-only mapping over one corpus section; values decode on lookup."""
+
+    def __getitem__(self, key):
+        return self._load(self._get_index()[key])
+
+    def __contains__(self, key):
+        return key in self._get_index()
+
+    def __iter__(self):
+        return iter(self._get_index())
+
+    def __len__(self):
+        return len(self._get_index())
+
+
+class CorpusList(_LazySection, Sequence):
+    """Read-only sequence over one corpus section; items decode on access."""
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        index = self._get_index()
+        if i < 0:
+            i += len(index)
+        return self._load(index[i])
+
+    def __len__(self):
+        return len(self._get_index())
+
+
+PLANET_MEANINGS = CorpusMapping("PLANET_MEANINGS")
+SIGN_PAIR_STRENGTHS = CorpusMapping("SIGN_PAIR_STRENGTHS")
+SIGN_PAIR_CHALLENGES = CorpusMapping("SIGN_PAIR_CHALLENGES")
+ASPECT_DESCRIPTIONS = CorpusMapping("ASPECT_DESCRIPTIONS")
+DAILY_INSIGHTS = CorpusMapping("DAILY_INSIGHTS")
+COSMIC_WEATHER = CorpusList("COSMIC_WEATHER")
+DAILY_CONNECTION_PROMPTS = CorpusMapping("DAILY_CONNECTION_PROMPTS")
+
+
+if __name__ == "__main__":
+    data = build_artifact()
+    print(f"Wrote {ARTIFACT} ({len(data)} bytes).")
@@ -1,50 +1,89 @@
+import copy
 import hashlib
 from datetime import date
-from app.services.astrology import get_sun_sign, ALL_SIGNS, SIGN_ELEMENTS, SIGN_MODALITIES
-from app.mock.interpretations import PLANET_MEANINGS
+from functools import lru_cache
+from app.services.astrology import get_sun_sign, ALL_SIGNS, SIGN_INDEX, SIGN_ELEMENTS, SIGN_MODALITIES
+from app.mock.corpus import PLANET_MEANINGS
+from app.services.timing import timed
 
+PLANET_NAMES = [
+    "sun", "moon", "rising", "mercury", "venus", "mars",
+    "jupiter", "saturn", "uranus", "neptune", "pluto",
+]
 
-def _hash_seed(birthdate: date, offset: int = 0) -> int:
-    s = f"{birthdate.isoformat()}-{offset}"
-    return int(hashlib.md5(s.encode()).hexdigest(), 16)
+# Distinct birthdates kept in the chart cache. A chart is ~2 KB of shared
+# structure, so the default bound stays well under 10 MB per worker.
+CHART_CACHE_SIZE = 4096
 
+# Stored charts are {"v": CHART_FORMAT_VERSION, "p": [[sign index, degree, house], ...]}
+# with one entry per PLANET_NAMES; everything else is rebuilt by hydrate_chart.
+CHART_FORMAT_VERSION = 1
+
+
+class FrozenDict(dict):
+    """A dict that rejects mutation, so cached charts can be shared safely.
+
+    It is still a real dict for JSON encoding and pydantic validation.
+    Copying or pickling produces a plain, mutable dict.
+    """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("natal chart data is read-only; copy it with dict() first")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+    __ior__ = _readonly
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return {k: copy.deepcopy(v, memo) for k, v in self.items()}
+
+
+def _planet_positions(birthdate: date) -> list[tuple[int, int]]:
+    """(sign index, degree) per planet, seeded by md5("<date>-<offset>").
+
+    The md5 state for the shared "<date>-" prefix is built once and copied
+    for each offset instead of formatting and hashing a fresh string each time.
+    """
+    prefix = hashlib.md5(f"{birthdate.isoformat()}-".encode())
+
+    def seed(offset: int) -> int:
+        h = prefix.copy()
+        h.update(str(offset).encode())
+        return int.from_bytes(h.digest(), "big")
+
+    sun_index = ALL_SIGNS.index(get_sun_sign(birthdate))
+    positions = []
+    for i, planet in enumerate(PLANET_NAMES):
+        sign_index = sun_index if planet == "sun" else seed(i + 1) % 12
+        degree = (seed(i + 100) % 29) + 1
+        positions.append((sign_index, degree))
+    return positions
 
-def generate_mock_natal_chart(
-    birthdate: date,
-    birth_time: str | None = None,
-    birth_location: str | None = None,
-) -> dict:
-    sun_sign = get_sun_sign(birthdate)
-    seed = _hash_seed(birthdate)
 
-    # Deterministic planet assignments
+@lru_cache(maxsize=None)
+def _placement(planet: str, sign: str, degree: int, house: int) -> FrozenDict:
+    # Bounded by 11 planets x 12 signs x 29 degrees; entries are shared across charts
+    planet_data = PLANET_MEANINGS.get(planet, {})
+    return FrozenDict({
+        "sign": sign,
+        "degree": degree,
+        "house": house,
+        "interpretation": planet_data.get(sign, ""),
+        "role": planet_data.get("_role", ""),
+    })
+
+
+@lru_cache(maxsize=CHART_CACHE_SIZE)
+def _build_chart(placements: tuple[tuple[int, int, int], ...]) -> FrozenDict:
     planets = {}
-    planet_names = [
-        "sun", "moon", "rising", "mercury", "venus", "mars",
-        "jupiter", "saturn", "uranus", "neptune", "pluto",
-    ]
-    for i, planet in enumerate(planet_names):
-        if planet == "sun":
-            sign = sun_sign
-        else:
-            idx = _hash_seed(birthdate, i + 1) % 12
-            sign = ALL_SIGNS[idx]
-
-        degree = (_hash_seed(birthdate, i + 100) % 29) + 1
-        house = (i % 12) + 1
-
-        # Look up interpretation
-        planet_data = PLANET_MEANINGS.get(planet, {})
-        interpretation = planet_data.get(sign, "")
-        role = planet_data.get("_role", "")
-
-        planets[planet] = {
-            "sign": sign,
-            "degree": degree,
-            "house": house,
-            "interpretation": interpretation,
-            "role": role,
-        }
+    for planet, (sign_index, degree, house) in zip(PLANET_NAMES, placements):
+        planets[planet] = _placement(planet, ALL_SIGNS[sign_index], degree, house)
 
     # Calculate element/modality distribution
     elements = {"fire": 0, "earth": 0, "air": 0, "water": 0}
@@ -59,10 +98,60 @@ def generate_mock_natal_chart(
     dominant_element = max(elements, key=elements.get)
     dominant_modality = max(modalities, key=modalities.get)
 
-    return {
+    return FrozenDict({
         **planets,
-        "elements": elements,
-        "modalities": modalities,
+        "elements": FrozenDict(elements),
+        "modalities": FrozenDict(modalities),
         "dominant_element": dominant_element,
         "dominant_modality": dominant_modality,
-    }
+    })
+
+
+@lru_cache(maxsize=CHART_CACHE_SIZE)
+def _chart_for_date(birthdate: date) -> FrozenDict:
+    return _build_chart(tuple(
+        (sign_index, degree, (i % 12) + 1)
+        for i, (sign_index, degree) in enumerate(_planet_positions(birthdate))
+    ))
+
+
+def compact_chart(chart: dict | None) -> dict | None:
+    """Reduce a full chart to its stored form.
+
+    Already-compact charts and anything that does not look like a generated
+    chart are returned unchanged.
+    """
+    if not chart or "v" in chart:
+        return chart
+    try:
+        placements = [
+            [SIGN_INDEX[chart[planet]["sign"]], chart[planet]["degree"], chart[planet]["house"]]
+            for planet in PLANET_NAMES
+        ]
+    except (KeyError, TypeError):
+        return chart
+    return {"v": CHART_FORMAT_VERSION, "p": placements}
+
+
+def hydrate_chart(data: dict | None) -> dict | None:
+    """Expand a stored chart back into the full, shared read-only chart.
+
+    Legacy full charts (rows not yet migrated) are returned unchanged.
+    """
+    if not data or data.get("v") != CHART_FORMAT_VERSION:
+        return data
+    return _build_chart(tuple(tuple(p) for p in data["p"]))
+
+
+@timed("chart")
+def generate_mock_natal_chart(
+    birthdate: date,
+    birth_time: str | None = None,
+    birth_location: str | None = None,
+) -> dict:
+    """Return the chart for a birthdate.
+
+    Charts depend only on the date and are memoized, so the returned mapping
+    and its nested placements are shared and read-only.
+    """
+    return _chart_for_date(birthdate)
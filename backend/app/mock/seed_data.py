@@ -1,14 +1,18 @@
-"""Seed data for development. Run with: python -m app.mock.seed_data"""
+"""Seed data for development. Run with: python -m app.mock.seed_data
+
+The schema must exist first (alembic upgrade head). The API also seeds at
+startup when SEED_ON_STARTUP is set.
+"""
 import asyncio
 from datetime import date, datetime
 from sqlalchemy import select
-from app.database import engine, async_session, Base
+from app.database import async_session
 from app.models.user import User, DepthPreference
 from app.models.contact import Contact, RelationshipTag
 from app.models.compatibility import Compatibility
 from app.services.auth import hash_password
 from app.mock.natal_charts import generate_mock_natal_chart
-from app.mock.compatibility_data import generate_mock_compatibility
+from app.mock.compatibility_data import compatibility_fingerprint, generate_mock_compatibility_bulk
 
 
 SEED_USERS = [
@@ -54,9 +58,6 @@ SEED_USERS = [
 
 
 async def seed():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
     async with async_session() as session:
         # Idempotency check: skip if already seeded
         existing = await session.execute(select(User).limit(1))
@@ -101,8 +102,10 @@ async def seed():
             await session.flush()  # Generate contact IDs
 
             # Pre-generate compatibility scores for all contacts
-            for contact, contact_chart in contacts:
-                data = generate_mock_compatibility(chart, contact_chart, user.depth_preference.value)
+            results = generate_mock_compatibility_bulk(
+                chart, [contact_chart for _, contact_chart in contacts], user.depth_preference.value
+            )
+            for (contact, contact_chart), data in zip(contacts, results):
                 compat = Compatibility(
                     user_id=user.id,
                     contact_id=contact.id,
@@ -110,6 +113,7 @@ async def seed():
                     compatibility_category=data["category"],
                     compatibility_data=data,
                     last_calculated=datetime.utcnow(),
+                    input_fingerprint=compatibility_fingerprint(chart, contact_chart, user.depth_preference.value),
                 )
                 session.add(compat)
 
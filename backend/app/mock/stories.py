@@ -1,4 +1,6 @@
-from app.services.astrology import get_element
+from functools import lru_cache
+from app.services.astrology import ALL_SIGNS, get_element
+from app.services.timing import timed
 
 
 STORY_TEMPLATES = {
@@ -249,20 +251,22 @@ SHARED_QUALITIES = {
 }
 
 
-def generate_mock_story(
-    user_chart: dict,
-    contact_chart: dict,
-    compatibility_data: dict,
-    contact_name: str,
-) -> dict:
-    category = compatibility_data["category"]
-    user_sun = compatibility_data["user_sun"]
-    contact_sun = compatibility_data["contact_sun"]
-    user_element = get_element(user_sun)
-    contact_element = get_element(contact_sun)
+# Every category x sign pair; each entry is a few KB of shared strings
+STORY_CACHE_SIZE = len(STORY_TEMPLATES) * len(ALL_SIGNS) ** 2
+# Stands in for the contact's name while rendering; never appears in templates
+_NAME_SLOT = "\x00contact_name\x00"
+
 
-    template = STORY_TEMPLATES.get(category, STORY_TEMPLATES["platonic_soulmate"])
+@lru_cache(maxsize=STORY_CACHE_SIZE)
+def _render_story(category: str, user_sun: str, contact_sun: str) -> tuple[str, tuple]:
+    """Render a category's story for a sign pair, leaving the contact's name open.
 
+    Returns (title, chapters) with each chapter as (title, body segments); the
+    body is the segments joined with the contact's name.
+    """
+    template = STORY_TEMPLATES[category]
+    user_element = get_element(user_sun)
+    contact_element = get_element(contact_sun)
     context = {
         "user_sign": user_sun.title(),
         "contact_sign": contact_sun.title(),
@@ -273,19 +277,32 @@ def generate_mock_story(
         "user_challenge": SIGN_CHALLENGES.get(user_sun, "overthinking"),
         "contact_challenge": SIGN_CHALLENGES.get(contact_sun, "overthinking"),
         "shared_quality": SHARED_QUALITIES.get(user_element, "resilience"),
-        "contact_name": contact_name,
+        "contact_name": _NAME_SLOT,
     }
+    chapters = tuple(
+        (ch["title"], tuple(ch["body"].format(**context).split(_NAME_SLOT)))
+        for ch in template["chapters"]
+    )
+    return template["title"], chapters
+
 
-    chapters = []
-    for ch in template["chapters"]:
-        chapters.append({
-            "title": ch["title"],
-            "body": ch["body"].format(**context),
-        })
+@timed("story")
+def generate_mock_story(
+    user_chart: dict,
+    contact_chart: dict,
+    compatibility_data: dict,
+    contact_name: str,
+) -> dict:
+    category = compatibility_data["category"]
+    if category not in STORY_TEMPLATES:
+        category = "platonic_soulmate"
+    user_sun = compatibility_data["user_sun"]
+    contact_sun = compatibility_data["contact_sun"]
 
+    title, chapters = _render_story(category, user_sun, contact_sun)
     return {
-        "title": template["title"],
-        "chapters": chapters,
+        "title": title,
+        "chapters": [{"title": ch_title, "body": contact_name.join(body)} for ch_title, body in chapters],
         "contact_name": contact_name,
         "user_sign": user_sun,
         "contact_sign": contact_sun,
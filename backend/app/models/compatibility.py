@@ -1,12 +1,20 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, JSON, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, Integer, JSON, DateTime, ForeignKey, Text, Index, desc
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 
 class Compatibility(Base):
     __tablename__ = "compatibilities"
+    __table_args__ = (
+        # Covers the top-matches query in its sort order (score, then contact id):
+        # no table lookups and no separate sort step
+        Index(
+            "ix_compatibilities_user_score",
+            "user_id", desc("soulmate_score"), "contact_id", "compatibility_category",
+        ),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
@@ -16,6 +24,8 @@ class Compatibility(Base):
     compatibility_data = Column(JSON, nullable=False)
     synastry_story = Column(Text, nullable=True)
     last_calculated = Column(DateTime, default=datetime.utcnow)
+    # compatibility_fingerprint() of the inputs last scored; NULL means unknown
+    input_fingerprint = Column(String(16), nullable=True)
 
     user = relationship("User", back_populates="compatibilities")
     contact = relationship("Contact", back_populates="compatibility")
@@ -1,9 +1,10 @@
 import enum
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Date, Enum, JSON, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, Date, Enum, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
+from app.models.types import NatalChartJSON
 
 
 class RelationshipTag(str, enum.Enum):
@@ -17,6 +18,10 @@ class RelationshipTag(str, enum.Enum):
 
 class Contact(Base):
     __tablename__ = "contacts"
+    __table_args__ = (
+        # Keyset pagination in list_contacts walks (user_id, name, id)
+        Index("ix_contacts_user_name_id", "user_id", "name", "id"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
@@ -25,7 +30,7 @@ class Contact(Base):
     birth_time = Column(String, nullable=True)
     birth_location = Column(String, nullable=True)
     relationship_tag = Column(Enum(RelationshipTag), nullable=False)
-    natal_chart_data = Column(JSON, nullable=True)
+    natal_chart_data = Column(NatalChartJSON, nullable=True)
     notes = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
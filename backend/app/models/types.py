@@ -0,0 +1,21 @@
+from sqlalchemy import JSON
+from sqlalchemy.types import TypeDecorator
+from app.mock.natal_charts import compact_chart, hydrate_chart
+
+
+class NatalChartJSON(TypeDecorator):
+    """JSON column holding a natal chart in compact form.
+
+    Full charts are compacted on write; on read the compact form is hydrated
+    from the in-memory interpretation tables, so the ORM attribute always
+    looks like the output of generate_mock_natal_chart.
+    """
+
+    impl = JSON
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return compact_chart(value)
+
+    def process_result_value(self, value, dialect):
+        return hydrate_chart(value)
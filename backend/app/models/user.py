@@ -1,9 +1,10 @@
 import enum
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Date, Time, Enum, JSON, DateTime
+from sqlalchemy import Column, String, Date, Time, Enum, DateTime
 from sqlalchemy.orm import relationship
 from app.database import Base
+from app.models.types import NatalChartJSON
 
 
 class DepthPreference(str, enum.Enum):
@@ -25,7 +26,7 @@ class User(Base):
     depth_preference = Column(
         Enum(DepthPreference), default=DepthPreference.SUN_ONLY, nullable=False
     )
-    natal_chart_data = Column(JSON, nullable=True)
+    natal_chart_data = Column(NatalChartJSON, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
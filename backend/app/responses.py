@@ -0,0 +1,49 @@
+from functools import lru_cache
+from typing import Any, Optional
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+from app.services.timing import phase
+
+
+def _encode_default(obj: Any):
+    # Validated models encode straight from their field values; orjson handles
+    # the nested dicts, dates, datetimes and str enums natively
+    if isinstance(obj, BaseModel):
+        return obj.__dict__
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class ORJSONResponse(JSONResponse):
+    """Default response class: encodes content with orjson instead of stdlib json."""
+
+    def render(self, content: Any) -> bytes:
+        with phase("serialize"):
+            return orjson.dumps(content, default=_encode_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+@lru_cache(maxsize=None)
+def _adapter(schema: Any) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+def model_response(
+    schema: Any,
+    content: Any,
+    response: Optional[Response] = None,
+    status_code: int = 200,
+) -> ORJSONResponse:
+    """Validate `content` against `schema` once and return it encoded.
+
+    `content` may be ORM objects, rows or dicts. Returning this from a route
+    skips FastAPI's second validation/serialization pass against the
+    response_model, which stays on the route for the OpenAPI schema. Headers set
+    on the route's injected `response` (ETag, X-Next-Cursor) are carried over.
+    """
+    with phase("serialize"):
+        validated = _adapter(schema).validate_python(content, from_attributes=True)
+        result = ORJSONResponse(validated, status_code=status_code)
+    if response is not None:
+        result.headers.raw.extend(response.headers.raw)
+    return result
@@ -3,8 +3,9 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.models.user import User, DepthPreference
-from app.schemas.user import UserCreate, LoginRequest, AuthResponse, UserResponse
-from app.services.auth import hash_password, verify_password, create_access_token
+from app.responses import model_response
+from app.schemas.user import UserCreate, LoginRequest, AuthResponse
+from app.services.auth import create_access_token, password_hasher, password_needs_rehash, user_cache
 from app.mock.natal_charts import generate_mock_natal_chart
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
@@ -21,7 +22,7 @@ async def signup(data: UserCreate, db: AsyncSession = Depends(get_db)):
     user = User(
         name=data.name,
         email=data.email,
-        hashed_password=hash_password(data.password),
+        hashed_password=await password_hasher.hash(data.password),
         birthdate=data.birthdate,
         birth_time=data.birth_time,
         birth_location=data.birth_location,
@@ -30,24 +31,25 @@ async def signup(data: UserCreate, db: AsyncSession = Depends(get_db)):
     )
     db.add(user)
     await db.commit()
+    user_cache.invalidate(user.id)
     await db.refresh(user)
 
     token = create_access_token(user.id)
-    return AuthResponse(
-        user=UserResponse.model_validate(user),
-        token=token,
-    )
+    return model_response(AuthResponse, {"user": user, "token": token}, status_code=201)
 
 
 @router.post("/login", response_model=AuthResponse)
 async def login(data: LoginRequest, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(User).where(User.email == data.email))
     user = result.scalar_one_or_none()
-    if not user or not verify_password(data.password, user.hashed_password):
+    if not user or not await password_hasher.verify(data.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
+    # Upgrade legacy salt$sha256 (or outdated bcrypt) hashes transparently
+    if password_needs_rehash(user.hashed_password):
+        user.hashed_password = await password_hasher.hash(data.password)
+        await db.commit()
+        user_cache.invalidate(user.id)
+
     token = create_access_token(user.id)
-    return AuthResponse(
-        user=UserResponse.model_validate(user),
-        token=token,
-    )
+    return model_response(AuthResponse, {"user": user, "token": token})
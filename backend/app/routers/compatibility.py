@@ -1,75 +1,77 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.models.user import User
-from app.models.contact import Contact
+from app.models.contact import Contact, RelationshipTag
 from app.models.compatibility import Compatibility
-from app.schemas.compatibility import CompatibilityResponse
+from app.responses import model_response
+from app.schemas.compatibility import CompatibilityResponse, TopMatch
 from app.services.auth import get_current_user
-from app.mock.compatibility_data import generate_mock_compatibility
+from app.services.compatibility import get_or_calculate
+from app.services.http_cache import (
+    compatibility_etag, etag_matches, load_validators, not_modified, set_etag,
+)
+from app.mock.compatibility_data import COMPATIBILITY_CATEGORIES
 
 router = APIRouter(prefix="/api/compatibility", tags=["compatibility"])
 
 
-async def _get_or_calculate(
-    contact_id: str, db: AsyncSession, user: User, force: bool = False,
-) -> Compatibility:
-    # Find contact
-    result = await db.execute(
-        select(Contact).where(Contact.id == contact_id, Contact.user_id == user.id)
-    )
-    contact = result.scalar_one_or_none()
-    if not contact:
-        raise HTTPException(status_code=404, detail="Contact not found")
+@router.get("/top", response_model=list[TopMatch])
+async def top_matches(
+    limit: int = Query(10, ge=1, le=100),
+    category: Optional[str] = Query(None),
+    tag: Optional[RelationshipTag] = Query(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """The user's highest-scoring contacts, served from ix_compatibilities_user_score."""
+    if category is not None and category not in COMPATIBILITY_CATEGORIES:
+        raise HTTPException(status_code=400, detail="Unknown compatibility category")
 
-    # Check existing
-    if not force:
-        existing = await db.execute(
-            select(Compatibility).where(Compatibility.contact_id == contact_id)
+    query = (
+        select(
+            Compatibility.contact_id,
+            Contact.name.label("contact_name"),
+            Compatibility.soulmate_score,
+            Compatibility.compatibility_category,
+            Contact.relationship_tag,
         )
-        compat = existing.scalar_one_or_none()
-        if compat:
-            return compat
-
-    # Calculate
-    user_chart = user.natal_chart_data or {}
-    contact_chart = contact.natal_chart_data or {}
-    data = generate_mock_compatibility(user_chart, contact_chart, user.depth_preference.value)
-
-    # Upsert
-    existing = await db.execute(
-        select(Compatibility).where(Compatibility.contact_id == contact_id)
+        .join(Contact, Contact.id == Compatibility.contact_id)
+        .where(Compatibility.user_id == current_user.id)
     )
-    compat = existing.scalar_one_or_none()
-
-    if compat:
-        compat.soulmate_score = data["overall_score"]
-        compat.compatibility_category = data["category"]
-        compat.compatibility_data = data
-    else:
-        compat = Compatibility(
-            user_id=user.id,
-            contact_id=contact_id,
-            soulmate_score=data["overall_score"],
-            compatibility_category=data["category"],
-            compatibility_data=data,
-        )
-        db.add(compat)
+    if category:
+        query = query.where(Compatibility.compatibility_category == category)
+    if tag:
+        query = query.where(Contact.relationship_tag == tag)
+    query = query.order_by(Compatibility.soulmate_score.desc(), Compatibility.contact_id).limit(limit)
 
-    await db.commit()
-    await db.refresh(compat)
-    return compat
+    result = await db.execute(query)
+    return model_response(list[TopMatch], result.all())
 
 
 @router.get("/{contact_id}", response_model=CompatibilityResponse)
 async def get_compatibility(
     contact_id: str,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    compat = await _get_or_calculate(contact_id, db, current_user)
-    return CompatibilityResponse.model_validate(compat)
+    if request.headers.get("if-none-match"):
+        validators = await load_validators(db, current_user, contact_id)
+        if validators and validators.last_calculated is not None:
+            etag = compatibility_etag(contact_id, *validators)
+            if etag_matches(request, etag):
+                return not_modified(etag)
+
+    contact, compat, inputs = await get_or_calculate(contact_id, db, current_user)
+    set_etag(response, compatibility_etag(
+        contact_id, contact.updated_at, compat.last_calculated, compat.synastry_story is not None,
+        inputs.updated_at, inputs.depth_preference,
+    ))
+    return model_response(CompatibilityResponse, compat, response)
 
 
 @router.post("/{contact_id}/recalculate", response_model=CompatibilityResponse)
@@ -78,5 +80,9 @@ async def recalculate_compatibility(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    compat = await _get_or_calculate(contact_id, db, current_user, force=True)
-    return CompatibilityResponse.model_validate(compat)
+    """Bring the stored compatibility up to date with both charts and the depth preference.
+
+    A no-op (no recalculation, no write) when none of its inputs have changed.
+    """
+    _, compat, _ = await get_or_calculate(contact_id, db, current_user)
+    return model_response(CompatibilityResponse, compat)
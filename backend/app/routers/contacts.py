@@ -1,5 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select
+import base64
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select, or_, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from app.database import get_db
@@ -7,51 +9,87 @@ from app.models.user import User
 from app.models.contact import Contact, RelationshipTag
 from app.models.compatibility import Compatibility
 from app.schemas.contact import ContactCreate, ContactUpdate, ContactResponse
+from app.responses import model_response
 from app.services.auth import get_current_user
+from app.services.compatibility import invalidate_stories
+from app.services.contact_import import import_contacts as run_import
+from app.services.http_cache import contact_etag, etag_matches, load_validators, not_modified, set_etag
 from app.mock.natal_charts import generate_mock_natal_chart
 
 router = APIRouter(prefix="/api/contacts", tags=["contacts"])
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
 
-def _to_response(contact: Contact, score: Optional[int] = None) -> ContactResponse:
-    return ContactResponse(
-        id=contact.id,
-        user_id=contact.user_id,
-        name=contact.name,
-        birthdate=contact.birthdate,
-        birth_time=contact.birth_time,
-        birth_location=contact.birth_location,
-        relationship_tag=contact.relationship_tag.value if isinstance(contact.relationship_tag, RelationshipTag) else contact.relationship_tag,
-        natal_chart_data=contact.natal_chart_data,
-        notes=contact.notes,
-        soulmate_score=score,
-    )
+
+def _encode_cursor(contact: Contact) -> str:
+    raw = json.dumps([contact.name, contact.id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[str, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        name, contact_id = json.loads(base64.urlsafe_b64decode(padded))
+        return str(name), str(contact_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _to_response(contact: Contact, score: Optional[int] = None) -> dict:
+    """ContactResponse fields for a contact; validated once by model_response."""
+    return {
+        "id": contact.id,
+        "user_id": contact.user_id,
+        "name": contact.name,
+        "birthdate": contact.birthdate,
+        "birth_time": contact.birth_time,
+        "birth_location": contact.birth_location,
+        "relationship_tag": contact.relationship_tag.value if isinstance(contact.relationship_tag, RelationshipTag) else contact.relationship_tag,
+        "natal_chart_data": contact.natal_chart_data,
+        "notes": contact.notes,
+        "soulmate_score": score,
+    }
 
 
 @router.get("", response_model=list[ContactResponse])
 async def list_contacts(
+    response: Response,
     tag: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    cursor: Optional[str] = Query(None),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    query = select(Contact).where(Contact.user_id == current_user.id)
+    """List contacts ordered by (name, id), with their scores in the same query.
+
+    Pass `limit` to page through the circle; when more rows remain, the cursor
+    for the next page is returned in the X-Next-Cursor header.
+    """
+    query = (
+        select(Contact, Compatibility.soulmate_score)
+        .outerjoin(Compatibility, Compatibility.contact_id == Contact.id)
+        .where(Contact.user_id == current_user.id)
+    )
     if tag:
         query = query.where(Contact.relationship_tag == RelationshipTag(tag))
-    query = query.order_by(Contact.name)
+    if cursor:
+        name, contact_id = _decode_cursor(cursor)
+        query = query.where(or_(
+            Contact.name > name,
+            and_(Contact.name == name, Contact.id > contact_id),
+        ))
+    query = query.order_by(Contact.name, Contact.id)
+    if limit:
+        query = query.limit(limit + 1)
 
     result = await db.execute(query)
-    contacts = result.scalars().all()
+    rows = result.all()
 
-    # Fetch scores
-    responses = []
-    for c in contacts:
-        score_result = await db.execute(
-            select(Compatibility.soulmate_score).where(Compatibility.contact_id == c.id)
-        )
-        score = score_result.scalar_one_or_none()
-        responses.append(_to_response(c, score))
+    if limit and len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = _encode_cursor(rows[-1][0])
 
-    return responses
+    return model_response(list[ContactResponse], [_to_response(contact, score) for contact, score in rows], response)
 
 
 @router.post("", response_model=ContactResponse, status_code=201)
@@ -75,27 +113,61 @@ async def create_contact(
     db.add(contact)
     await db.commit()
     await db.refresh(contact)
-    return _to_response(contact)
+    return model_response(ContactResponse, _to_response(contact), status_code=201)
+
+
+@router.post("/import")
+async def import_contacts(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    compute_compatibility: bool = Query(False),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Bulk-create contacts from a streamed CSV (with header row) or NDJSON upload.
+
+    Columns/keys match ContactCreate. The format comes from `format` or the
+    Content-Type; the response reports per-row errors for rows that were skipped.
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        if "csv" in content_type:
+            format = "csv"
+        elif "ndjson" in content_type or "jsonl" in content_type or "json" in content_type:
+            format = "ndjson"
+        else:
+            raise HTTPException(status_code=415, detail="Upload text/csv or application/x-ndjson")
+
+    return await run_import(request.stream(), format, db, current_user, compute_compatibility)
 
 
 @router.get("/{contact_id}", response_model=ContactResponse)
 async def get_contact(
     contact_id: str,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
+    if request.headers.get("if-none-match"):
+        validators = await load_validators(db, current_user, contact_id)
+        if validators:
+            etag = contact_etag(contact_id, validators.updated_at, validators.last_calculated)
+            if etag_matches(request, etag):
+                return not_modified(etag)
+
     result = await db.execute(
-        select(Contact).where(Contact.id == contact_id, Contact.user_id == current_user.id)
+        select(Contact, Compatibility.soulmate_score, Compatibility.last_calculated)
+        .outerjoin(Compatibility, Compatibility.contact_id == Contact.id)
+        .where(Contact.id == contact_id, Contact.user_id == current_user.id)
     )
-    contact = result.scalar_one_or_none()
-    if not contact:
+    row = result.one_or_none()
+    if not row:
         raise HTTPException(status_code=404, detail="Contact not found")
 
-    score_result = await db.execute(
-        select(Compatibility.soulmate_score).where(Compatibility.contact_id == contact.id)
-    )
-    score = score_result.scalar_one_or_none()
-    return _to_response(contact, score)
+    contact, score, last_calculated = row
+    set_etag(response, contact_etag(contact.id, contact.updated_at, last_calculated))
+    return model_response(ContactResponse, _to_response(contact, score), response)
 
 
 @router.put("/{contact_id}", response_model=ContactResponse)
@@ -126,14 +198,19 @@ async def update_contact(
         contact.notes = data.notes
 
     # Regenerate chart if birth details changed
-    if data.birthdate is not None or data.birth_time is not None or data.birth_location is not None:
+    chart_changed = data.birthdate is not None or data.birth_time is not None or data.birth_location is not None
+    if chart_changed:
         contact.natal_chart_data = generate_mock_natal_chart(
             contact.birthdate, contact.birth_time, contact.birth_location
         )
 
+    # Stored stories embed the contact's name and chart
+    if chart_changed or data.name is not None:
+        await invalidate_stories(db, contact_id=contact.id)
+
     await db.commit()
     await db.refresh(contact)
-    return _to_response(contact)
+    return model_response(ContactResponse, _to_response(contact))
 
 
 @router.delete("/{contact_id}")
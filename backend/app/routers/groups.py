@@ -0,0 +1,183 @@
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db
+from app.models.user import User
+from app.models.contact import Contact
+from app.models.group import Group
+from app.schemas.group import (
+    GroupCreate, GroupUpdate, GroupResponse, GroupMatrixResponse, GroupMember, GroupPair,
+)
+from app.services.auth import get_current_user
+from app.services.astrology import SIGN_ELEMENTS
+from app.mock.compatibility_data import compatibility_engine, COMPATIBILITY_CATEGORIES, ELEMENTS
+
+router = APIRouter(prefix="/api/groups", tags=["groups"])
+
+
+async def _get_group(group_id: str, db: AsyncSession, user: User) -> Group:
+    result = await db.execute(
+        select(Group).where(Group.id == group_id, Group.user_id == user.id)
+    )
+    group = result.scalar_one_or_none()
+    if not group:
+        raise HTTPException(status_code=404, detail="Group not found")
+    return group
+
+
+async def _validate_members(member_ids: list[str], db: AsyncSession, user: User) -> list[str]:
+    """De-duplicate member ids (keeping order) and check they are the user's contacts."""
+    member_ids = list(dict.fromkeys(member_ids))
+    if member_ids:
+        result = await db.execute(
+            select(Contact.id).where(Contact.id.in_(member_ids), Contact.user_id == user.id)
+        )
+        found = set(result.scalars().all())
+        missing = [m for m in member_ids if m not in found]
+        if missing:
+            raise HTTPException(status_code=400, detail=f"Unknown contact ids: {', '.join(missing)}")
+    return member_ids
+
+
+@router.get("", response_model=list[GroupResponse])
+async def list_groups(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    result = await db.execute(
+        select(Group).where(Group.user_id == current_user.id).order_by(Group.name, Group.id)
+    )
+    return result.scalars().all()
+
+
+@router.post("", response_model=GroupResponse, status_code=201)
+async def create_group(
+    data: GroupCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    group = Group(
+        user_id=current_user.id,
+        name=data.name,
+        member_contact_ids=await _validate_members(data.member_contact_ids, db, current_user),
+    )
+    db.add(group)
+    await db.commit()
+    await db.refresh(group)
+    return group
+
+
+@router.get("/{group_id}", response_model=GroupResponse)
+async def get_group(
+    group_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    return await _get_group(group_id, db, current_user)
+
+
+@router.put("/{group_id}", response_model=GroupResponse)
+async def update_group(
+    group_id: str,
+    data: GroupUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    group = await _get_group(group_id, db, current_user)
+    if data.name is not None:
+        group.name = data.name
+    if data.member_contact_ids is not None:
+        group.member_contact_ids = await _validate_members(data.member_contact_ids, db, current_user)
+
+    await db.commit()
+    await db.refresh(group)
+    return group
+
+
+@router.delete("/{group_id}")
+async def delete_group(
+    group_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    group = await _get_group(group_id, db, current_user)
+    await db.delete(group)
+    await db.commit()
+    return {"message": "Group deleted"}
+
+
+def _pair(members: list[GroupMember], i: int, j: int, score: float) -> GroupPair:
+    return GroupPair(member_ids=[members[i].id, members[j].id], score=round(float(score), 1))
+
+
+@router.get("/{group_id}/matrix", response_model=GroupMatrixResponse)
+async def get_group_matrix(
+    group_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Pairwise compatibility among the user and every group member, plus group aggregates.
+
+    scores[i][j] scores member i as the "user" side against member j, so
+    full-chart matrices can be asymmetric (Venus of i vs Mars of j). Pair
+    aggregates use the mean of both directions.
+    """
+    group = await _get_group(group_id, db, current_user)
+    member_ids = group.member_contact_ids or []
+
+    result = await db.execute(
+        select(Contact.id, Contact.name, Contact.natal_chart_data)
+        .where(Contact.id.in_(member_ids), Contact.user_id == current_user.id)
+    )
+    # Keep group order; contacts deleted since the group was saved drop out
+    by_id = {row.id: row for row in result.all() if row.natal_chart_data}
+    rows = [by_id[m] for m in member_ids if m in by_id]
+
+    charts = [current_user.natal_chart_data or {}] + [row.natal_chart_data for row in rows]
+    if "sun" not in charts[0]:
+        raise HTTPException(status_code=400, detail="Your natal chart is missing")
+    members = [GroupMember(
+        id=current_user.id, name=current_user.name, sun_sign=charts[0]["sun"]["sign"], is_user=True,
+    )] + [
+        GroupMember(id=row.id, name=row.name, sun_sign=row.natal_chart_data["sun"]["sign"])
+        for row in rows
+    ]
+
+    depth = current_user.depth_preference.value
+    scores, categories = compatibility_engine.score_matrix(charts, depth)
+    n = len(charts)
+
+    # Aggregates over unordered pairs, using the mean of both directions
+    average = harmonious = challenging = None
+    if n > 1:
+        symmetric = (scores + scores.T) / 2
+        upper_i, upper_j = np.triu_indices(n, k=1)
+        pair_scores = symmetric[upper_i, upper_j]
+        best, worst = int(pair_scores.argmax()), int(pair_scores.argmin())
+        average = round(float(pair_scores.mean()), 1)
+        harmonious = _pair(members, upper_i[best], upper_j[best], pair_scores[best])
+        challenging = _pair(members, upper_i[worst], upper_j[worst], pair_scores[worst])
+
+    element_balance = dict.fromkeys(ELEMENTS, 0)
+    for member in members:
+        element_balance[SIGN_ELEMENTS.get(member.sun_sign, "fire")] += 1
+
+    score_rows = scores.tolist()
+    category_rows = [[COMPATIBILITY_CATEGORIES[c] for c in row] for row in categories.tolist()]
+    for i in range(n):
+        score_rows[i][i] = None
+        category_rows[i][i] = None
+
+    return GroupMatrixResponse(
+        group_id=group.id,
+        depth_preference=depth,
+        members=members,
+        scores=score_rows,
+        categories=category_rows,
+        average_score=average,
+        most_harmonious_pair=harmonious,
+        most_challenging_pair=challenging,
+        element_balance=element_balance,
+        dominant_element=max(element_balance, key=element_balance.get),
+    )
@@ -1,23 +1,30 @@
-from datetime import date
+import enum
+import json
+from datetime import date, datetime
 from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.database import get_db
+from app.database import get_db, async_session
 from app.models.user import User, DepthPreference
 from app.models.contact import Contact
+from app.models.compatibility import Compatibility
+from app.models.group import Group
+from app.responses import model_response
 from app.schemas.user import UserResponse, UserUpdate, DepthUpdate
-from app.services.auth import get_current_user
+from app.services.auth import get_current_user, user_cache
+from app.services.compatibility import invalidate_stories
+from app.services.recalculation import start_recalculation, recalculation_status
 from app.services.astrology import get_sun_sign
+from app.services.forecast import daily_forecast_block, connection_prompt, spotlight_rank
 from app.mock.natal_charts import generate_mock_natal_chart
-from app.mock.interpretations import DAILY_INSIGHTS, COSMIC_WEATHER, DAILY_CONNECTION_PROMPTS
-from app.services.astrology import SIGN_ELEMENTS
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 
 
 @router.get("/me", response_model=UserResponse)
 async def get_me(current_user: User = Depends(get_current_user)):
-    return UserResponse.model_validate(current_user)
+    return model_response(UserResponse, current_user)
 
 
 @router.put("/me", response_model=UserResponse)
@@ -40,8 +47,9 @@ async def update_me(
         )
 
     await db.commit()
+    user_cache.invalidate(current_user.id)
     await db.refresh(current_user)
-    return UserResponse.model_validate(current_user)
+    return model_response(UserResponse, current_user)
 
 
 @router.put("/me/depth", response_model=UserResponse)
@@ -50,26 +58,40 @@ async def update_depth(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    current_user.depth_preference = DepthPreference(data.depth_preference)
+    depth = DepthPreference(data.depth_preference)
+    changed = depth != current_user.depth_preference
+    if changed:
+        current_user.depth_preference = depth
+        await invalidate_stories(db, user_id=current_user.id)
     await db.commit()
+    user_cache.invalidate(current_user.id)
     await db.refresh(current_user)
-    return UserResponse.model_validate(current_user)
+
+    # Stored scores were computed at the old depth; rescore the circle in bulk
+    if changed:
+        start_recalculation(current_user.id, current_user.natal_chart_data or {}, depth.value)
+    return model_response(UserResponse, current_user)
+
+
+@router.get("/me/depth/recalculation")
+async def get_recalculation_status(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Progress of the background rescoring started by the last depth change."""
+    return await recalculation_status(db, current_user.id)
 
 
 @router.get("/me/daily-insight")
 async def get_daily_insight(current_user: User = Depends(get_current_user)):
     """Get a personalized daily cosmic insight based on the user's sun sign."""
     sun_sign = get_sun_sign(current_user.birthdate)
-    insights = DAILY_INSIGHTS.get(sun_sign, DAILY_INSIGHTS["aries"])
-
-    # Pick insight based on day of year for daily rotation
-    today = date.today()
-    day_index = today.timetuple().tm_yday % len(insights)
+    block = daily_forecast_block(date.today(), sun_sign)
 
     return {
         "sign": sun_sign,
-        "insight": insights[day_index],
-        "date": today.isoformat(),
+        "insight": block["personal_insight"],
+        "date": block["date"],
     }
 
 
@@ -80,43 +102,22 @@ async def get_daily_forecast(
 ):
     """Get a rich daily forecast: cosmic weather, personal insight, and connection spotlights."""
     today = date.today()
-    day_of_year = today.timetuple().tm_yday
-
-    # User's sun sign and element
     sun_sign = get_sun_sign(current_user.birthdate)
-    user_element = SIGN_ELEMENTS.get(sun_sign, "fire")
-
-    # Daily personal insight
-    insights = DAILY_INSIGHTS.get(sun_sign, DAILY_INSIGHTS["aries"])
-    day_index = day_of_year % len(insights)
 
-    # Cosmic weather (rotates through transits)
-    weather_index = day_of_year % len(COSMIC_WEATHER)
-    weather = COSMIC_WEATHER[weather_index]
-
-    # Connection spotlights — pick 2 contacts with date-specific messages
+    # Connection spotlights — the day's top 3 by a stable day-seeded rank
     result = await db.execute(
-        select(Contact).where(Contact.user_id == current_user.id)
+        select(Contact.id, Contact.name, Contact.birthdate, Contact.relationship_tag)
+        .where(Contact.user_id == current_user.id)
+        .order_by(spotlight_rank(Contact.id, today), Contact.id)
+        .limit(3)
     )
-    contacts = result.scalars().all()
 
-    spotlights = []
-    for i, contact in enumerate(contacts):
+    featured = []
+    for i, contact in enumerate(result.all()):
         contact_sign = get_sun_sign(contact.birthdate)
-        contact_element = SIGN_ELEMENTS.get(contact_sign, "fire")
-
-        # Get element pair key (sorted for consistency)
-        pair = tuple(sorted([user_element, contact_element]))
-        prompts = DAILY_CONNECTION_PROMPTS.get(pair, DAILY_CONNECTION_PROMPTS.get(
-            (user_element, contact_element),
-            DAILY_CONNECTION_PROMPTS[("fire", "fire")],
-        ))
+        message = connection_prompt(today, sun_sign, contact_sign, i).format(name=contact.name)
 
-        # Pick a different prompt per contact per day
-        prompt_index = (day_of_year + i * 7) % len(prompts)
-        message = prompts[prompt_index].format(name=contact.name)
-
-        spotlights.append({
+        featured.append({
             "contact_id": contact.id,
             "contact_name": contact.name,
             "contact_sign": contact_sign,
@@ -124,15 +125,73 @@ async def get_daily_forecast(
             "message": message,
         })
 
-    # Shuffle deterministically based on day (pick top 2-3)
-    spotlights.sort(key=lambda s: hash(s["contact_id"] + str(day_of_year)))
-    featured = spotlights[:min(3, len(spotlights))]
-
     return {
-        "date": today.isoformat(),
-        "formatted_date": today.strftime("%A, %B %d"),
-        "sign": sun_sign,
-        "personal_insight": insights[day_index],
-        "cosmic_weather": weather,
+        **daily_forecast_block(today, sun_sign),
         "connection_spotlights": featured,
     }
+
+
+EXPORT_YIELD_PER = 200
+
+
+def _export_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    raise TypeError(f"Cannot export {type(value).__name__}")
+
+
+def _export_line(record: dict) -> bytes:
+    return (json.dumps(record, default=_export_default, ensure_ascii=False) + "\n").encode()
+
+
+def _columns(obj, *exclude: str) -> dict:
+    return {c.key: getattr(obj, c.key) for c in obj.__table__.columns if c.key not in exclude}
+
+
+async def _export_circle(user_id: str):
+    # Own session: the response body is produced after the request's dependencies exit
+    async with async_session() as session:
+        user = await session.get(User, user_id)
+        yield _export_line({"type": "user", "user": _columns(user, "hashed_password")})
+
+        result = await session.stream(
+            select(Contact, Compatibility)
+            .outerjoin(Compatibility, Compatibility.contact_id == Contact.id)
+            .where(Contact.user_id == user_id)
+            .order_by(Contact.id)
+            .execution_options(yield_per=EXPORT_YIELD_PER)
+        )
+        async for contact, compat in result:
+            compatibility = story = None
+            if compat is not None:
+                compatibility = _columns(compat, "synastry_story")
+                story = json.loads(compat.synastry_story) if compat.synastry_story else None
+            yield _export_line({
+                "type": "contact",
+                "contact": _columns(contact),
+                "compatibility": compatibility,
+                "story": story,
+            })
+            # Rows are not needed once written; keep the identity map from growing
+            session.expunge(contact)
+            if compat is not None:
+                session.expunge(compat)
+
+        groups = await session.stream_scalars(
+            select(Group).where(Group.user_id == user_id).order_by(Group.id)
+            .execution_options(yield_per=EXPORT_YIELD_PER)
+        )
+        async for group in groups:
+            yield _export_line({"type": "group", "group": _columns(group)})
+
+
+@router.get("/me/export")
+async def export_me(current_user: User = Depends(get_current_user)):
+    """Stream the user's whole circle as NDJSON: user, contacts (with compatibility and story), groups."""
+    return StreamingResponse(
+        _export_circle(current_user.id),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="cosmiccircle-export.ndjson"'},
+    )
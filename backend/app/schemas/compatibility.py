@@ -23,3 +23,11 @@ class StoryResponse(BaseModel):
     contact_name: str
     user_sign: str
     contact_sign: str
+
+
+class TopMatch(BaseModel):
+    contact_id: str
+    contact_name: str
+    soulmate_score: int
+    compatibility_category: str
+    relationship_tag: str
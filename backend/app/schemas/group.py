@@ -0,0 +1,50 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+
+class GroupCreate(BaseModel):
+    name: str
+    member_contact_ids: list[str] = []
+
+
+class GroupUpdate(BaseModel):
+    name: Optional[str] = None
+    member_contact_ids: Optional[list[str]] = None
+
+
+class GroupResponse(BaseModel):
+    id: str
+    user_id: str
+    name: str
+    member_contact_ids: list[str]
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class GroupMember(BaseModel):
+    id: str
+    name: str
+    sun_sign: str
+    is_user: bool = False
+
+
+class GroupPair(BaseModel):
+    member_ids: list[str]
+    score: float
+
+
+class GroupMatrixResponse(BaseModel):
+    group_id: str
+    depth_preference: str
+    members: list[GroupMember]
+    scores: list[list[Optional[int]]]
+    categories: list[list[Optional[str]]]
+    average_score: Optional[float] = None
+    most_harmonious_pair: Optional[GroupPair] = None
+    most_challenging_pair: Optional[GroupPair] = None
+    element_balance: dict[str, int]
+    dominant_element: Optional[str] = None
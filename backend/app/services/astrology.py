@@ -20,6 +20,8 @@ ALL_SIGNS = [
     "libra", "scorpio", "sagittarius", "capricorn", "aquarius", "pisces",
 ]
 
+SIGN_INDEX = {sign: i for i, sign in enumerate(ALL_SIGNS)}
+
 SIGN_ELEMENTS = {
     "aries": "fire", "leo": "fire", "sagittarius": "fire",
     "taurus": "earth", "virgo": "earth", "capricorn": "earth",
@@ -52,7 +54,7 @@ def get_sun_sign(birthdate: date) -> str:
 
 
 def get_sign_index(sign: str) -> int:
-    return ALL_SIGNS.index(sign)
+    return SIGN_INDEX[sign]
 
 
 def get_aspect(sign1: str, sign2: str) -> str:
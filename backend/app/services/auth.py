@@ -1,27 +1,150 @@
+import asyncio
 import hashlib
-import secrets
+import hmac
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
-from sqlalchemy import select
+from passlib.context import CryptContext
+from sqlalchemy import select, inspect
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 from app.config import settings
 from app.database import get_db
 from app.models.user import User
+from app.services.timing import phase
 
 security = HTTPBearer()
 
 
+class UserCache:
+    """Bounded, TTL-based cache of user rows keyed by user id.
+
+    Entries are detached snapshots; get_current_user merges them into the
+    request's session without a SELECT. The cache is per process, so other
+    workers may serve a stale row for up to `ttl` seconds after a write —
+    handlers that change a user must call invalidate() on their own worker.
+    """
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, User]] = OrderedDict()
+
+    def get(self, user_id: str) -> User | None:
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[user_id]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, user: User) -> None:
+        if self.ttl <= 0 or self.max_size <= 0:
+            return
+        snapshot = User(**{attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs})
+        make_transient_to_detached(snapshot)
+        self._entries[user.id] = (time.monotonic() + self.ttl, snapshot)
+        self._entries.move_to_end(user.id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: str) -> None:
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+user_cache = UserCache(settings.user_cache_ttl_seconds, settings.user_cache_max_size)
+
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.password_hash_rounds,
+)
+
+
+def _is_legacy_hash(hashed: str) -> bool:
+    # Pre-bcrypt hashes are "<hex salt>$<sha256 hex>"; modular crypt hashes start with "$"
+    return not hashed.startswith("$") and "$" in hashed
+
+
 def hash_password(password: str) -> str:
-    salt = secrets.token_hex(16)
-    hashed = hashlib.sha256((salt + password).encode()).hexdigest()
-    return f"{salt}${hashed}"
+    return pwd_context.hash(password)
 
 
 def verify_password(plain: str, hashed: str) -> bool:
-    salt, stored_hash = hashed.split("$", 1)
-    return hashlib.sha256((salt + plain).encode()).hexdigest() == stored_hash
+    if _is_legacy_hash(hashed):
+        salt, stored_hash = hashed.split("$", 1)
+        computed = hashlib.sha256((salt + plain).encode()).hexdigest()
+        return hmac.compare_digest(computed, stored_hash)
+    return pwd_context.verify(plain, hashed)
+
+
+def password_needs_rehash(hashed: str) -> bool:
+    return _is_legacy_hash(hashed) or pwd_context.needs_update(hashed)
+
+
+class PasswordHasher:
+    """Runs password hashing on a bounded thread pool off the event loop.
+
+    bcrypt releases the GIL, so a few threads keep login storms from stalling
+    other requests. When more than `max_queue` jobs are waiting, new ones are
+    rejected with 503 instead of queueing without bound.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.pending = 0  # submitted and not yet finished; only touched on the event loop
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self.pending - self.workers)
+
+    async def submit(self, fn, *args):
+        if self.queue_depth >= self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503, detail="Too many sign-ins in progress, try again shortly",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        try:
+            with phase("password"):
+                return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self.submit(hash_password, password)
+
+    async def verify(self, plain: str, hashed: str) -> bool:
+        return await self.submit(verify_password, plain, hashed)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "in_flight": min(self.pending, self.workers),
+            "queue_depth": self.queue_depth,
+            "rejected": self.rejected,
+        }
+
+
+password_hasher = PasswordHasher(settings.password_hash_workers, settings.password_hash_max_queue)
 
 
 def create_access_token(user_id: str) -> str:
@@ -34,17 +157,23 @@ async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db),
 ) -> User:
-    token = credentials.credentials
-    try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        user_id: str = payload.get("sub")
-        if user_id is None:
+    with phase("auth"):
+        token = credentials.credentials
+        try:
+            payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+            user_id: str = payload.get("sub")
+            if user_id is None:
+                raise HTTPException(status_code=401, detail="Invalid token")
+        except JWTError:
             raise HTTPException(status_code=401, detail="Invalid token")
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Invalid token")
-
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
-    if user is None:
-        raise HTTPException(status_code=401, detail="User not found")
-    return user
+
+        cached = user_cache.get(user_id)
+        if cached is not None:
+            return await db.merge(cached, load=False)
+
+        result = await db.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one_or_none()
+        if user is None:
+            raise HTTPException(status_code=401, detail="User not found")
+        user_cache.put(user)
+        return user
@@ -0,0 +1,140 @@
+import json
+import uuid
+from datetime import datetime
+from typing import NamedTuple, Optional
+from fastapi import HTTPException
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.user import DepthPreference, User
+from app.models.contact import Contact
+from app.models.compatibility import Compatibility
+from app.mock.compatibility_data import compatibility_fingerprint, generate_mock_compatibility
+from app.mock.stories import generate_mock_story
+
+
+def dialect_insert(db: AsyncSession):
+    """The INSERT construct supporting ON CONFLICT for the session's database."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert
+    if dialect == "sqlite":
+        return sqlite.insert
+    raise RuntimeError(f"No upsert support for the {dialect} dialect")
+
+
+class ScoringInputs(NamedTuple):
+    """The user's side of a compatibility, as stored.
+
+    Read together with the contact rather than taken from the authenticated
+    user, which may come from another worker's stale user cache.
+    """
+    natal_chart_data: Optional[dict]
+    depth_preference: DepthPreference
+    updated_at: datetime
+
+
+async def get_or_calculate(
+    contact_id: str, db: AsyncSession, user: User,
+) -> tuple[Contact, Compatibility, ScoringInputs]:
+    """Load a contact with its compatibility, calculating and saving it when stale.
+
+    A stored result is current while its input fingerprint (the charts'
+    relevant placements, the depth preference and the engine version) matches;
+    otherwise it is recalculated. One joined read, then (when calculating) one
+    upsert that returns the stored row, so concurrent first views of a contact
+    don't race on the unique key.
+    """
+    result = await db.execute(
+        select(Contact, Compatibility, User.natal_chart_data, User.depth_preference, User.updated_at)
+        .join(User, User.id == Contact.user_id)
+        .outerjoin(Compatibility, Compatibility.contact_id == Contact.id)
+        .where(Contact.id == contact_id, Contact.user_id == user.id)
+    )
+    row = result.one_or_none()
+    if not row:
+        raise HTTPException(status_code=404, detail="Contact not found")
+    contact, compat = row[:2]
+    inputs = ScoringInputs(*row[2:])
+
+    user_chart = inputs.natal_chart_data or {}
+    contact_chart = contact.natal_chart_data or {}
+    depth = inputs.depth_preference.value
+    fingerprint = compatibility_fingerprint(user_chart, contact_chart, depth)
+    if compat and compat.input_fingerprint == fingerprint:
+        return contact, compat, inputs
+
+    data = generate_mock_compatibility(user_chart, contact_chart, depth)
+
+    insert = dialect_insert(db)
+    stmt = insert(Compatibility).values(
+        id=str(uuid.uuid4()),
+        user_id=user.id,
+        contact_id=contact_id,
+        soulmate_score=data["overall_score"],
+        compatibility_category=data["category"],
+        compatibility_data=data,
+        synastry_story=None,
+        last_calculated=datetime.utcnow(),
+        input_fingerprint=fingerprint,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Compatibility.contact_id],
+        set_={
+            "soulmate_score": stmt.excluded.soulmate_score,
+            "compatibility_category": stmt.excluded.compatibility_category,
+            "compatibility_data": stmt.excluded.compatibility_data,
+            "synastry_story": None,
+            "last_calculated": stmt.excluded.last_calculated,
+            "input_fingerprint": stmt.excluded.input_fingerprint,
+        },
+    ).returning(Compatibility)
+    compat = (await db.scalars(stmt, execution_options={"populate_existing": True})).one()
+    await db.commit()
+    return contact, compat, inputs
+
+
+async def get_or_render_story(
+    contact_id: str, db: AsyncSession, user: User,
+) -> tuple[Contact, Compatibility, ScoringInputs, dict]:
+    """Return the stored synastry story for a contact, rendering and saving it on first use.
+
+    The story is only stored while the row still holds the score it was
+    rendered from; if a rescore replaced it meanwhile, the story is returned
+    without being saved.
+    """
+    contact, compat, inputs = await get_or_calculate(contact_id, db, user)
+    if compat.synastry_story:
+        return contact, compat, inputs, json.loads(compat.synastry_story)
+
+    story = generate_mock_story(
+        inputs.natal_chart_data or {}, contact.natal_chart_data or {},
+        compat.compatibility_data, contact.name,
+    )
+    await db.execute(
+        update(Compatibility)
+        .where(
+            Compatibility.id == compat.id,
+            Compatibility.input_fingerprint == compat.input_fingerprint,
+        )
+        .values(synastry_story=json.dumps(story))
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return contact, compat, inputs, story
+
+
+async def invalidate_stories(db: AsyncSession, *, user_id: str | None = None, contact_id: str | None = None):
+    """Clear stored stories for a contact or for a user's whole circle.
+
+    Stories depend on the contact's chart and name and on the user's depth
+    preference; callers changing any of those must invalidate. The caller commits.
+    """
+    stmt = update(Compatibility).values(synastry_story=None)
+    if contact_id is not None:
+        stmt = stmt.where(Compatibility.contact_id == contact_id)
+    elif user_id is not None:
+        stmt = stmt.where(Compatibility.user_id == user_id)
+    else:
+        raise ValueError("invalidate_stories needs a user_id or contact_id")
+    await db.execute(stmt)
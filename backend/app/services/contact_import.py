@@ -0,0 +1,200 @@
+import codecs
+import csv
+import json
+import uuid
+from collections.abc import AsyncIterator
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.user import User
+from app.models.contact import Contact, RelationshipTag
+from app.models.compatibility import Compatibility
+from app.schemas.contact import ContactCreate
+from app.mock.natal_charts import generate_mock_natal_chart
+from app.mock.compatibility_data import compatibility_fingerprint, generate_mock_compatibility_bulk
+
+IMPORT_BATCH_SIZE = 500
+IMPORT_MAX_ROWS = 10_000
+IMPORT_MAX_ERRORS = 1_000
+# Longest line, or CSV record spanning lines, held while parsing
+IMPORT_MAX_LINE_BYTES = 64 * 1024
+
+
+class ImportStreamError(ValueError):
+    """The upload can't be read any further (not UTF-8, or a line/record too long)."""
+
+
+def _decode(line: bytes) -> str:
+    try:
+        return line.decode("utf-8")
+    except UnicodeDecodeError:
+        raise ImportStreamError("Upload is not valid UTF-8 text") from None
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into lines (with endings) and decode each one.
+
+    Splitting on the "\n" byte is safe before decoding, since it never occurs
+    inside a multi-byte UTF-8 sequence; it also keeps "\r\n" together across
+    chunks and, unlike str.splitlines(), leaves \x85, \u2028, \x0c and the
+    like inside JSON strings or quoted CSV fields alone. Lines before an
+    undecodable one are still yielded, and lines are capped at
+    IMPORT_MAX_LINE_BYTES so a stream without newlines can't buffer unbounded.
+    """
+    pending, first = b"", True
+    async for chunk in chunks:
+        *complete, pending = (pending + chunk).split(b"\n")
+        for line in complete:
+            if len(line) > IMPORT_MAX_LINE_BYTES:
+                raise ImportStreamError(f"Line longer than {IMPORT_MAX_LINE_BYTES} bytes")
+            if first:
+                line, first = line.removeprefix(codecs.BOM_UTF8), False
+            yield _decode(line + b"\n")
+        if len(pending) > IMPORT_MAX_LINE_BYTES:
+            raise ImportStreamError(f"Line longer than {IMPORT_MAX_LINE_BYTES} bytes")
+    if first:
+        pending = pending.removeprefix(codecs.BOM_UTF8)
+    if pending:
+        yield _decode(pending)
+
+
+async def _csv_records(lines: AsyncIterator[str]) -> AsyncIterator[tuple[int, dict | str]]:
+    header = None
+    record: list[str] = []
+    size, row = 0, 0
+    async for line in lines:
+        if not record and not line.strip():
+            continue
+        record.append(line)
+        size += len(line.encode())
+        # Let the csv module decide where a record ends: a quoted field may
+        # span lines, while a bare quote inside an unquoted field is just text.
+        # Strict mode reports a record cut short instead of closing the field.
+        try:
+            parsed = list(csv.reader(record, strict=True))
+        except csv.Error as e:
+            if str(e) == "unexpected end of data":
+                if size > IMPORT_MAX_LINE_BYTES:
+                    raise ImportStreamError(f"CSV record longer than {IMPORT_MAX_LINE_BYTES} bytes")
+                continue
+            parsed = e
+        record, size = [], 0
+        if header is None:
+            if isinstance(parsed, csv.Error):
+                raise ImportStreamError(f"Invalid CSV header: {parsed}")
+            header = [h.strip().lower() for h in parsed[0]]
+            continue
+        row += 1
+        if isinstance(parsed, csv.Error):
+            yield row, f"Invalid CSV: {parsed}"
+            continue
+        yield row, {k: (v.strip() or None) for k, v in zip(header, parsed[0])}
+    if record:
+        yield row + 1, "Unterminated quoted field"
+
+
+async def _ndjson_records(lines: AsyncIterator[str]) -> AsyncIterator[tuple[int, dict | str]]:
+    row = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            value = json.loads(line)
+        except ValueError as e:
+            yield row, f"Invalid JSON: {e}"
+            continue
+        yield row, value if isinstance(value, dict) else "Expected a JSON object"
+
+
+def _parse(record: dict) -> ContactCreate:
+    data = ContactCreate.model_validate(record)
+    RelationshipTag(data.relationship_tag)
+    return data
+
+
+async def import_contacts(
+    chunks: AsyncIterator[bytes],
+    fmt: str,
+    db: AsyncSession,
+    user: User,
+    compute_compatibility: bool = False,
+) -> dict:
+    """Parse an uploaded CSV/NDJSON stream and insert contacts in chunked transactions.
+
+    Invalid rows are skipped and reported; valid rows are committed every
+    IMPORT_BATCH_SIZE rows, so a failure late in the file keeps earlier batches.
+    An unreadable stream (bad encoding, oversized line) ends the import with an
+    error after the rows before it, and the report says how far it got.
+    """
+    records = _csv_records(_lines(chunks)) if fmt == "csv" else _ndjson_records(_lines(chunks))
+    user_chart = user.natal_chart_data or {}
+    depth = user.depth_preference.value
+    report = {"imported": 0, "failed": 0, "compatibilities": 0, "errors": []}
+    batch: list[dict] = []
+
+    def fail(row: int, error: str):
+        report["failed"] += 1
+        if len(report["errors"]) < IMPORT_MAX_ERRORS:
+            report["errors"].append({"row": row, "error": error})
+
+    async def flush():
+        if not batch:
+            return
+        await db.execute(insert(Contact), batch)
+        if compute_compatibility and "sun" in user_chart:
+            results = generate_mock_compatibility_bulk(
+                user_chart, [c["natal_chart_data"] for c in batch], depth
+            )
+            await db.execute(insert(Compatibility), [
+                {
+                    "user_id": user.id,
+                    "contact_id": c["id"],
+                    "soulmate_score": data["overall_score"],
+                    "compatibility_category": data["category"],
+                    "compatibility_data": data,
+                    "input_fingerprint": compatibility_fingerprint(user_chart, c["natal_chart_data"], depth),
+                }
+                for c, data in zip(batch, results)
+            ])
+            report["compatibilities"] += len(batch)
+        await db.commit()
+        report["imported"] += len(batch)
+        batch.clear()
+
+    row = 0
+    try:
+        async for row, record in records:
+            if row > IMPORT_MAX_ROWS:
+                fail(row, f"Import is limited to {IMPORT_MAX_ROWS} rows")
+                break
+            if isinstance(record, str):
+                fail(row, record)
+                continue
+            try:
+                data = _parse(record)
+            except ValidationError as e:
+                fail(row, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()))
+                continue
+            except ValueError:
+                fail(row, f"relationship_tag: must be one of {', '.join(t.value for t in RelationshipTag)}")
+                continue
+
+            batch.append({
+                "id": str(uuid.uuid4()),
+                "user_id": user.id,
+                "name": data.name,
+                "birthdate": data.birthdate,
+                "birth_time": data.birth_time,
+                "birth_location": data.birth_location,
+                "relationship_tag": RelationshipTag(data.relationship_tag),
+                "natal_chart_data": generate_mock_natal_chart(data.birthdate, data.birth_time, data.birth_location),
+                "notes": data.notes,
+            })
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                await flush()
+    except ImportStreamError as e:
+        fail(row + 1, str(e))
+
+    await flush()
+    return report
@@ -0,0 +1,77 @@
+import hashlib
+from datetime import date
+from functools import lru_cache
+from sqlalchemy import Integer, String, literal
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from app.services.astrology import SIGN_ELEMENTS
+from app.mock.corpus import DAILY_INSIGHTS, COSMIC_WEATHER, DAILY_CONNECTION_PROMPTS
+
+
+class spotlight_rank(FunctionElement):
+    """Stable, day-seeded rank for a contact id: the first 28 bits of md5("<id>:<day>").
+
+    Unlike Python's salted hash(), every worker (and the database) agrees on
+    the order, so the day's spotlights can be picked with ORDER BY ... LIMIT.
+    On SQLite this calls the spotlight_rank UDF registered in app.database.
+    """
+
+    type = Integer()
+    name = "spotlight_rank"
+    inherit_cache = True
+
+    def __init__(self, contact_id, day: date):
+        super().__init__(contact_id, literal(day.isoformat(), String))
+
+
+@compiles(spotlight_rank)
+def _compile_spotlight_rank(element, compiler, **kw):
+    return "spotlight_rank(%s)" % compiler.process(element.clauses, **kw)
+
+
+@compiles(spotlight_rank, "postgresql")
+def _compile_spotlight_rank_postgresql(element, compiler, **kw):
+    contact_id, day = (compiler.process(c, **kw) for c in element.clauses)
+    return f"('x' || substr(md5({contact_id} || ':' || {day}), 1, 7))::bit(28)::int"
+
+
+def spotlight_rank_value(contact_id: str, day: str) -> int:
+    return int(hashlib.md5(f"{contact_id}:{day}".encode()).hexdigest()[:7], 16)
+
+
+@lru_cache(maxsize=12 * 8)
+def daily_forecast_block(day: date, sign: str) -> dict:
+    """The part of the daily forecast shared by everyone with this sun sign.
+
+    Cached per (day, sign); the returned dict is shared and must not be mutated.
+    """
+    day_of_year = day.timetuple().tm_yday
+    insights = DAILY_INSIGHTS.get(sign, DAILY_INSIGHTS["aries"])
+    return {
+        "date": day.isoformat(),
+        "formatted_date": day.strftime("%A, %B %d"),
+        "sign": sign,
+        "personal_insight": insights[day_of_year % len(insights)],
+        # Cosmic weather (rotates through transits)
+        "cosmic_weather": COSMIC_WEATHER[day_of_year % len(COSMIC_WEATHER)],
+    }
+
+
+@lru_cache(maxsize=4 * 4)
+def _connection_prompts(user_element: str, contact_element: str) -> list[str]:
+    # Decoded from the corpus once per element pair; shared, must not be mutated
+    pair = tuple(sorted([user_element, contact_element]))
+    return DAILY_CONNECTION_PROMPTS.get(pair, DAILY_CONNECTION_PROMPTS.get(
+        (user_element, contact_element),
+        DAILY_CONNECTION_PROMPTS[("fire", "fire")],
+    ))
+
+
+def connection_prompt(day: date, user_sign: str, contact_sign: str, position: int) -> str:
+    """Unformatted prompt for the contact featured at `position` on `day`."""
+    prompts = _connection_prompts(
+        SIGN_ELEMENTS.get(user_sign, "fire"), SIGN_ELEMENTS.get(contact_sign, "fire"),
+    )
+
+    # Pick a different prompt per contact per day
+    return prompts[(day.timetuple().tm_yday + position * 7) % len(prompts)]
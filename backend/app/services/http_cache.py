@@ -0,0 +1,85 @@
+import hashlib
+from fastapi import Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.user import User
+from app.models.contact import Contact
+from app.models.compatibility import Compatibility
+from app.mock.compatibility_data import ENGINE_VERSION
+
+# Clients may keep the body but must revalidate before reusing it
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag over the given version markers (timestamps, ids, preferences)."""
+    raw = "|".join("" if p is None else str(p) for p in parts)
+    return '"%s"' % hashlib.sha1(raw.encode()).hexdigest()
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so ignore any W/ prefix
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def contact_etag(contact_id: str, updated_at, last_calculated) -> str:
+    return make_etag("contact", contact_id, updated_at, last_calculated)
+
+
+def _scoring_inputs(user_updated_at, depth_preference) -> tuple:
+    # A changed user chart, depth or engine makes the stored result stale; it is
+    # recalculated on the next full read, so the validator must change too.
+    # Callers pass the user's stored values, never the (possibly stale) cached user.
+    return user_updated_at, depth_preference.value, ENGINE_VERSION
+
+
+def compatibility_etag(contact_id: str, updated_at, last_calculated, has_story: bool,
+                       user_updated_at, depth_preference) -> str:
+    return make_etag(
+        "compatibility", contact_id, updated_at, last_calculated, has_story,
+        *_scoring_inputs(user_updated_at, depth_preference),
+    )
+
+
+def story_etag(contact_id: str, updated_at, last_calculated, user_updated_at, depth_preference) -> str:
+    return make_etag(
+        "story", contact_id, updated_at, last_calculated, *_scoring_inputs(user_updated_at, depth_preference),
+    )
+
+
+async def load_validators(db: AsyncSession, user: User, contact_id: str):
+    """Fetch just the version markers for a contact and its compatibility.
+
+    Returns a row of (updated_at, last_calculated, has_story, user_updated_at,
+    depth_preference) or None if the contact does not exist. last_calculated
+    is None when nothing is stored yet. The user's columns are read here, not
+    taken from `user`, which may be a stale cached copy.
+    """
+    result = await db.execute(
+        select(
+            Contact.updated_at,
+            Compatibility.last_calculated,
+            Compatibility.synastry_story.is_not(None).label("has_story"),
+            User.updated_at.label("user_updated_at"),
+            User.depth_preference,
+        )
+        .join(User, User.id == Contact.user_id)
+        .outerjoin(Compatibility, Compatibility.contact_id == Contact.id)
+        .where(Contact.id == contact_id, Contact.user_id == user.id)
+    )
+    return result.one_or_none()
@@ -0,0 +1,105 @@
+"""Prometheus text exposition of the in-process request, DB and worker stats."""
+from app.database import pool_stats
+from app.services.auth import user_cache, password_hasher
+from app.services.timing import timing_stats, Histogram
+
+PREFIX = "cosmiccircle_"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_bound(bound) -> str:
+    return f"{bound:g}"
+
+
+class _Exposition:
+    def __init__(self):
+        self.lines = []
+
+    def family(self, name: str, kind: str, help_text: str) -> str:
+        name = PREFIX + name
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+        return name
+
+    def sample(self, name: str, value, **labels) -> None:
+        self.lines.append(f"{name}{_labels(**labels)} {value}")
+
+    def histogram(self, name: str, histogram: Histogram, **labels) -> None:
+        for bound, count in zip((*map(_format_bound, histogram.bounds), "+Inf"), histogram.cumulative()):
+            self.sample(f"{name}_bucket", count, **labels, le=bound)
+        self.sample(f"{name}_sum", round(histogram.sum, 6), **labels)
+        self.sample(f"{name}_count", histogram.count, **labels)
+
+
+def render_metrics() -> str:
+    out = _Exposition()
+    routes = sorted(timing_stats.routes.items())
+
+    name = out.family("http_requests_total", "counter", "Requests by route and response status.")
+    for (method, route), stats in routes:
+        for status, count in sorted(stats.statuses.items()):
+            out.sample(name, count, method=method, route=route, status=status)
+
+    name = out.family("http_request_duration_seconds", "histogram", "Request latency by route.")
+    for (method, route), stats in routes:
+        out.histogram(name, stats.phases["total"], method=method, route=route)
+
+    name = out.family(
+        "http_request_phase_seconds", "histogram",
+        "Time per request spent in each phase (auth, db, chart, serialize, ...).",
+    )
+    for (method, route), stats in routes:
+        for phase, histogram in sorted(stats.phases.items()):
+            if phase != "total":
+                out.histogram(name, histogram, method=method, route=route, phase=phase)
+
+    name = out.family("db_statements_per_request", "histogram", "SQL statements executed per request.")
+    for (method, route), stats in routes:
+        out.histogram(name, stats.statements, method=method, route=route)
+
+    name = out.family(
+        "db_n_plus_one_requests_total", "counter",
+        "Requests that repeated one statement shape more than the N+1 threshold.",
+    )
+    for (method, route), stats in routes:
+        out.sample(name, stats.n_plus_one, method=method, route=route)
+
+    cache = user_cache.stats()
+    out.sample(out.family("user_cache_hits_total", "counter", "Authenticated user cache hits."), cache["hits"])
+    out.sample(out.family("user_cache_misses_total", "counter", "Authenticated user cache misses."), cache["misses"])
+    out.sample(out.family("user_cache_entries", "gauge", "Users currently cached."), cache["size"])
+
+    hasher = password_hasher.stats()
+    out.sample(out.family("password_hasher_workers", "gauge", "Password hashing threads."), hasher["workers"])
+    out.sample(out.family("password_hasher_in_flight", "gauge", "Hashes being computed."), hasher["in_flight"])
+    out.sample(out.family("password_hasher_queue_depth", "gauge", "Hashes waiting for a thread."), hasher["queue_depth"])
+    out.sample(
+        out.family("password_hasher_rejected_total", "counter", "Sign-ins rejected because the queue was full."),
+        hasher["rejected"],
+    )
+
+    pool = pool_stats()
+    for key, kind, help_text in (
+        ("size", "gauge", "Configured connection pool size."),
+        ("checked_out", "gauge", "Connections in use."),
+        ("checked_in", "gauge", "Idle pooled connections."),
+        ("overflow", "gauge", "Connections opened beyond the pool size."),
+        ("waits", "counter", "Connection checkouts."),
+        ("wait_seconds_total", "counter", "Total time checkouts waited for a connection."),
+        ("wait_seconds_max", "gauge", "Longest checkout wait."),
+    ):
+        if key in pool:
+            metric = f"db_pool_{key}" + ("_total" if key == "waits" else "")
+            out.sample(out.family(metric, kind, help_text), pool[key])
+
+    return "\n".join(out.lines) + "\n"
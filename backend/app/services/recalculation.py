@@ -0,0 +1,164 @@
+import asyncio
+import logging
+from datetime import datetime
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import async_session
+from app.models.user import User
+from app.models.contact import Contact
+from app.models.compatibility import Compatibility
+from app.mock.compatibility_data import compatibility_fingerprint, generate_mock_compatibility_bulk
+from app.services.compatibility import dialect_insert
+from app.services.timing import detach_request
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 500
+# Columns a rescore writes; everything else on the row is left as it is
+RESCORED_COLUMNS = (
+    "soulmate_score", "compatibility_category", "compatibility_data",
+    "synastry_story", "last_calculated", "input_fingerprint",
+)
+
+# Jobs running in this process, keyed by user id, so a newer depth change can
+# cancel one early; jobs on other workers notice the change and stop themselves
+_tasks: dict[str, asyncio.Task] = {}
+
+
+async def recalculation_status(db: AsyncSession, user_id: str) -> dict:
+    """How much of a user's circle is scored for their current inputs.
+
+    Read from the database, so every worker reports the same progress and it
+    survives the worker running the job: a contact counts as processed once
+    its stored fingerprint matches the user's current chart and depth. Rows a
+    lost job never reached are still recalculated when first viewed.
+    """
+    user = (await db.execute(
+        select(User.natal_chart_data, User.depth_preference).where(User.id == user_id)
+    )).one()
+    user_chart = user.natal_chart_data or {}
+    depth = user.depth_preference.value
+
+    total = processed = 0
+    result = await db.stream(
+        select(Contact.natal_chart_data, Compatibility.input_fingerprint)
+        .outerjoin(Compatibility, Compatibility.contact_id == Contact.id)
+        .where(Contact.user_id == user_id)
+        .execution_options(yield_per=CHUNK_SIZE)
+    )
+    async for contact_chart, fingerprint in result:
+        total += 1
+        processed += fingerprint == compatibility_fingerprint(user_chart, contact_chart or {}, depth)
+    return {
+        "state": "done" if processed == total else "running",
+        "depth_preference": depth,
+        "total": total,
+        "processed": processed,
+    }
+
+
+def start_recalculation(user_id: str, user_chart: dict, depth: str) -> None:
+    """Recalculate every compatibility of a user's circle in the background.
+
+    A job already running in this process for the user (e.g. for a previous
+    depth) is cancelled.
+    """
+    running = _tasks.get(user_id)
+    if running and not running.done():
+        running.cancel()
+
+    task = asyncio.create_task(_run(user_id, user_chart, depth))
+    _tasks[user_id] = task
+    task.add_done_callback(lambda t: _tasks.pop(user_id, None) if _tasks.get(user_id) is t else None)
+
+
+async def _run(user_id: str, user_chart: dict, depth: str):
+    detach_request()
+    try:
+        await recalculate_circle(user_id, user_chart, depth)
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        logger.exception("Compatibility recalculation failed for user %s", user_id)
+
+
+async def _superseded(session: AsyncSession, user_id: str, user_chart: dict, depth: str) -> bool:
+    # Another depth change (possibly handled by another worker) started a newer job
+    result = await session.execute(
+        select(User.natal_chart_data, User.depth_preference).where(User.id == user_id)
+    )
+    user = result.one_or_none()
+    return user is None or user.depth_preference.value != depth or (user.natal_chart_data or {}) != user_chart
+
+
+async def recalculate_circle(user_id: str, user_chart: dict, depth: str) -> int:
+    """Score all of a user's contacts in chunks, writing one transaction per chunk.
+
+    Rows whose input fingerprint already matches are left untouched. Stops
+    early once the user's chart or depth no longer matches the job's.
+    """
+    processed = 0
+    last_id = ""
+    async with async_session() as session:
+        while True:
+            if await _superseded(session, user_id, user_chart, depth):
+                break
+            result = await session.execute(
+                select(Contact.id, Contact.natal_chart_data)
+                .where(Contact.user_id == user_id, Contact.id > last_id)
+                .order_by(Contact.id)
+                .limit(CHUNK_SIZE)
+            )
+            rows = result.all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            existing = await session.execute(
+                select(Compatibility.contact_id, Compatibility.id, Compatibility.input_fingerprint)
+                .where(Compatibility.contact_id.in_([row.id for row in rows]))
+            )
+            existing_rows = {contact_id: (compat_id, fp) for contact_id, compat_id, fp in existing.all()}
+
+            fingerprints = [
+                compatibility_fingerprint(user_chart, row.natal_chart_data or {}, depth) for row in rows
+            ]
+            stale = [
+                (row, fp) for row, fp in zip(rows, fingerprints)
+                if existing_rows.get(row.id, (None, None))[1] != fp
+            ]
+            results = generate_mock_compatibility_bulk(
+                user_chart, [row.natal_chart_data or {} for row, _ in stale], depth
+            )
+
+            now = datetime.utcnow()
+            updates, inserts = [], []
+            for (row, fingerprint), data in zip(stale, results):
+                values = {
+                    "soulmate_score": data["overall_score"],
+                    "compatibility_category": data["category"],
+                    "compatibility_data": data,
+                    "synastry_story": None,
+                    "last_calculated": now,
+                    "input_fingerprint": fingerprint,
+                }
+                if row.id in existing_rows:
+                    updates.append({"id": existing_rows[row.id][0], **values})
+                else:
+                    inserts.append({"user_id": user_id, "contact_id": row.id, **values})
+
+            if updates:
+                await session.execute(update(Compatibility), updates)
+            if inserts:
+                # A first view of a contact may have stored its row since the
+                # snapshot above; overwrite it rather than fail the chunk
+                stmt = dialect_insert(session)(Compatibility)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[Compatibility.contact_id],
+                    set_={column: stmt.excluded[column] for column in RESCORED_COLUMNS},
+                )
+                await session.execute(stmt, inserts)
+            await session.commit()
+
+            processed += len(rows)
+    return processed
@@ -0,0 +1,259 @@
+import functools
+import logging
+import re
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+from starlette.datastructures import MutableHeaders
+
+# Upper bounds, Prometheus-style; the last bucket is +Inf
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+# Placeholder lists ("?, ?, ?", "$1, $2", "%(a)s, %(b)s") collapse to one, so an
+# expanded IN (...) has the same shape whatever its length
+_PLACEHOLDER_LIST = re.compile(r"(\?|\$\d+|%\(\w+\)s)(?:\s*,\s*(?:\?|\$\d+|%\(\w+\)s))+")
+_WHITESPACE = re.compile(r"\s+")
+
+logger = logging.getLogger("uvicorn.error")
+
+
+@functools.lru_cache(maxsize=1024)
+def statement_shape(statement: str) -> str:
+    return _PLACEHOLDER_LIST.sub(r"\1", _WHITESPACE.sub(" ", statement).strip())
+
+
+class RequestTimings:
+    """Wall time per named phase, and SQL statements by shape, for one request.
+
+    Phases may overlap (a query inside `auth` also counts towards `db`); a phase
+    re-entered while already running is only counted once.
+    """
+
+    __slots__ = ("phases", "active", "statements", "batches")
+
+    def __init__(self):
+        self.phases: dict[str, float] = {}
+        self.active: set[str] = set()
+        self.statements: Counter[str] = Counter()
+        # executemany() batches; repeated by design, so not part of N+1 detection
+        self.batches = 0
+
+    def add(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def header(self, total: float) -> str:
+        metrics = []
+        for name, seconds in self.phases.items():
+            metric = f"{name};dur={seconds * 1000:.2f}"
+            if name == "db":
+                metric += f';desc="{self.statement_count} statements"'
+            metrics.append(metric)
+        metrics.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(metrics)
+
+    @property
+    def statement_count(self) -> int:
+        return sum(self.statements.values()) + self.batches
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+class Phase:
+    """Context manager adding its wall time to a phase of the current request.
+
+    A no-op outside a request (CLIs, benchmarks, background jobs).
+    """
+
+    __slots__ = ("name", "timings", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.timings = None
+
+    def __enter__(self):
+        timings = _current.get()
+        if timings is not None and self.name not in timings.active:
+            timings.active.add(self.name)
+            self.timings = timings
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.timings is not None:
+            self.timings.add(self.name, time.perf_counter() - self.start)
+            self.timings.active.discard(self.name)
+            self.timings = None
+        return False
+
+
+def phase(name: str) -> Phase:
+    return Phase(name)
+
+
+def record(name: str, seconds: float) -> None:
+    """Add time measured elsewhere (e.g. by SQLAlchemy events) to the current request."""
+    timings = _current.get()
+    # Already inside a running phase of the same name, which counts this time
+    if timings is not None and name not in timings.active:
+        timings.add(name, seconds)
+
+
+def record_statement(statement: str, seconds: float, executemany: bool = False) -> None:
+    """Count one executed SQL statement and add its time to the `db` phase."""
+    timings = _current.get()
+    if timings is not None:
+        if executemany:
+            timings.batches += 1
+        else:
+            timings.statements[statement_shape(statement)] += 1
+        if "db" not in timings.active:
+            timings.add("db", seconds)
+
+
+def detach_request() -> None:
+    """Stop attributing work in the current task to the request that spawned it.
+
+    Tasks copy the caller's context, so call this first thing in background jobs.
+    """
+    _current.set(None)
+
+
+def timed(name: str):
+    """Decorator attributing a function's wall time to a phase."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return func(*args, **kwargs)
+            with Phase(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class Histogram:
+    __slots__ = ("bounds", "buckets", "count", "sum")
+
+    def __init__(self, bounds: tuple = LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.buckets[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> list[int]:
+        counts, running = [], 0
+        for n in self.buckets:
+            running += n
+            counts.append(running)
+        return counts
+
+
+class RouteStats:
+    __slots__ = ("phases", "statements", "statuses", "n_plus_one")
+
+    def __init__(self):
+        self.phases: dict[str, Histogram] = {}
+        self.statements = Histogram(STATEMENT_BUCKETS)
+        self.statuses: Counter[int] = Counter()
+        self.n_plus_one = 0
+
+
+class PhaseHistograms:
+    """Per (method, route template): phase latency and statement-count histograms,
+    response statuses and suspected N+1 requests, kept in-process."""
+
+    def __init__(self):
+        self.routes: dict[tuple[str, str], RouteStats] = {}
+
+    def observe(self, method: str, route: str, status: int, timings: RequestTimings,
+                total: float, n_plus_one: bool = False) -> None:
+        stats = self.routes.get((method, route))
+        if stats is None:
+            stats = self.routes[(method, route)] = RouteStats()
+        for name, seconds in (*timings.phases.items(), ("total", total)):
+            histogram = stats.phases.get(name)
+            if histogram is None:
+                histogram = stats.phases[name] = Histogram()
+            histogram.observe(seconds)
+        stats.statements.observe(timings.statement_count)
+        stats.statuses[status] += 1
+        stats.n_plus_one += n_plus_one
+
+    def stats(self) -> dict:
+        return {
+            f"{method} {route}": {
+                "statuses": dict(stats.statuses),
+                "n_plus_one": stats.n_plus_one,
+                "statements": {"count": stats.statements.count, "sum": stats.statements.sum,
+                               "buckets": stats.statements.cumulative()},
+                "phases": {
+                    name: {"count": h.count, "sum": round(h.sum, 6), "buckets": h.cumulative()}
+                    for name, h in stats.phases.items()
+                },
+            }
+            for (method, route), stats in sorted(self.routes.items())
+        }
+
+
+timing_stats = PhaseHistograms()
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware timing each request's phases and counting its SQL statements.
+
+    Adds a Server-Timing header (phases finished before the response starts,
+    plus `total`) and records everything in `timing_stats` once the response
+    body has been sent. A request that runs one statement shape more than
+    `n_plus_one_threshold` times is logged as a likely N+1.
+    """
+
+    def __init__(self, app, header: bool = True, n_plus_one_threshold: int = 10):
+        self.app = app
+        self.header = header
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.header:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", timings.header(time.perf_counter() - start))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            total = time.perf_counter() - start
+            _current.reset(token)
+            # Templates, not raw paths, so ids don't explode the route count
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            n_plus_one = False
+            if timings.statements:
+                shape, count = timings.statements.most_common(1)[0]
+                if count > self.n_plus_one_threshold:
+                    n_plus_one = True
+                    logger.warning(
+                        "Possible N+1 in %s %s: %d executions of %s (%d statements in total)",
+                        scope["method"], route, count, shape[:200], timings.statement_count,
+                    )
+            timing_stats.observe(scope["method"], route, status, timings, total, n_plus_one)
@@ -0,0 +1,90 @@
+"""Synthetic users and contacts shared by the benchmarks.
+
+Birth details are deterministic, so runs against the same size are comparable.
+"""
+import uuid
+from datetime import date, timedelta
+from sqlalchemy import insert
+from app.database import async_session
+from app.models.user import User, DepthPreference
+from app.models.contact import Contact, RelationshipTag
+from app.services.auth import hash_password
+from app.mock.natal_charts import generate_mock_natal_chart
+
+LOCATIONS = ["Pittsburgh, PA", "Miami, FL", "San Francisco, CA", "Austin, TX", "Seattle, WA", "Chicago, IL"]
+TAGS = list(RelationshipTag)
+DEPTHS = list(DepthPreference)
+BENCH_PASSWORD = "benchmark"
+BATCH_SIZE = 500
+
+
+def birth_details(i: int) -> tuple[date, str, str]:
+    """Birthdate, time and location for the i-th synthetic person.
+
+    Consecutive people are 97 days apart, which walks every sun sign and a
+    spread of moon and rising placements.
+    """
+    birthdate = date(1960, 1, 1) + timedelta(days=i * 97 % 20000)
+    birth_time = f"{i % 24:02d}:{i * 7 % 60:02d}"
+    return birthdate, birth_time, LOCATIONS[i % len(LOCATIONS)]
+
+
+def bench_email(i: int) -> str:
+    return f"bench{i}@cosmiccircle.test"
+
+
+def make_contacts(count: int, user_id: str, offset: int = 0) -> list[dict]:
+    """Contact rows with full natal charts, shaped like ContactResponse plus a score."""
+    contacts = []
+    for i in range(offset, offset + count):
+        birthdate, birth_time, location = birth_details(i)
+        contacts.append({
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "name": f"Contact {i:05d}",
+            "birthdate": birthdate,
+            "birth_time": birth_time,
+            "birth_location": location,
+            "relationship_tag": TAGS[i % len(TAGS)].value,
+            "natal_chart_data": generate_mock_natal_chart(birthdate, birth_time, location),
+            "notes": None,
+            "soulmate_score": 40 + i % 60,
+        })
+    return contacts
+
+
+async def seed_database(users: int, contacts_per_user: int) -> list[str]:
+    """Insert `users` users with `contacts_per_user` contacts each; returns their emails.
+
+    Every user shares BENCH_PASSWORD, hashed once. Depth preferences rotate so
+    journeys exercise all three story depths. The schema must already exist.
+    """
+    hashed = hash_password(BENCH_PASSWORD)
+    emails = []
+    async with async_session() as db:
+        user_rows, contact_rows = [], []
+        for u in range(users):
+            birthdate, birth_time, location = birth_details(u * 31 + 5)
+            user_id = str(uuid.uuid4())
+            user_rows.append({
+                "id": user_id,
+                "name": f"Bench User {u}",
+                "email": bench_email(u),
+                "hashed_password": hashed,
+                "birthdate": birthdate,
+                "birth_time": birth_time,
+                "birth_location": location,
+                "depth_preference": DEPTHS[u % len(DEPTHS)],
+                "natal_chart_data": generate_mock_natal_chart(birthdate, birth_time, location),
+            })
+            for row in make_contacts(contacts_per_user, user_id, offset=u * contacts_per_user):
+                row.pop("soulmate_score")
+                row["relationship_tag"] = RelationshipTag(row["relationship_tag"])
+                contact_rows.append(row)
+            emails.append(bench_email(u))
+
+        await db.execute(insert(User), user_rows)
+        for start in range(0, len(contact_rows), BATCH_SIZE):
+            await db.execute(insert(Contact), contact_rows[start:start + BATCH_SIZE])
+        await db.commit()
+    return emails
@@ -0,0 +1,227 @@
+"""Micro-benchmarks for the chart, compatibility and story engines.
+
+Run with: python -m benchmarks.engines [--save] [--threshold 0.15] [--filter story]
+
+Each case calls one pure function over realistic inputs covering every sun
+sign (and every depth where it applies) and records ops/sec and per-call
+allocations (tracemalloc peak and retained bytes). With --save the results
+become the baseline; otherwise they are compared with the stored baseline and
+the run exits non-zero when any case is slower, or allocates more, by more
+than --threshold. Baselines are machine-specific: record one on the machine
+you compare on.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+from app.services.astrology import ALL_SIGNS, get_aspect, get_sun_sign
+from app.models.user import DepthPreference
+from app.mock import natal_charts, stories
+from app.mock.natal_charts import generate_mock_natal_chart
+from app.mock.compatibility_data import generate_mock_compatibility
+from app.mock.stories import generate_mock_story
+from benchmarks.dataset import birth_details
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "engines.baseline.json")
+DEPTHS = [d.value for d in DepthPreference]
+CHARTS_PER_SIGN = 4
+# Allocation deltas below this many bytes are noise (interned ints, dict resizes)
+ALLOC_SLACK_BYTES = 256
+
+
+def _people_by_sign() -> dict[str, list[tuple[date, str, str]]]:
+    by_sign = {sign: [] for sign in ALL_SIGNS}
+    i = 0
+    while any(len(people) < CHARTS_PER_SIGN for people in by_sign.values()):
+        details = birth_details(i)
+        people = by_sign[get_sun_sign(details[0])]
+        if len(people) < CHARTS_PER_SIGN:
+            people.append(details)
+        i += 1
+    return by_sign
+
+
+def _cold_chart(details: tuple[date, str, str]):
+    # A birthdate the process has not seen yet; placements stay cached as in a warm worker
+    natal_charts._chart_for_date.cache_clear()
+    natal_charts._build_chart.cache_clear()
+    return generate_mock_natal_chart(*details)
+
+
+def _cold_story(*args):
+    # Renders from the templates, as on a fresh worker
+    stories._render_story.cache_clear()
+    return generate_mock_story(*args)
+
+
+def build_cases() -> dict[str, tuple]:
+    """Case name -> (function, list of argument tuples cycled through)."""
+    by_sign = _people_by_sign()
+    people = [p for sign in ALL_SIGNS for p in by_sign[sign]]
+    charts = {sign: [generate_mock_natal_chart(*p) for p in by_sign[sign]] for sign in ALL_SIGNS}
+
+    # Every ordered sun-sign pair, varying moon and rising across the pairs
+    chart_pairs = [
+        (charts[s1][(i + j) % CHARTS_PER_SIGN], charts[s2][(i * 3 + j) % CHARTS_PER_SIGN])
+        for i, s1 in enumerate(ALL_SIGNS)
+        for j, s2 in enumerate(ALL_SIGNS)
+    ]
+    cases = {
+        "natal_chart": (generate_mock_natal_chart, people),
+        "natal_chart.cold": (_cold_chart, [(p,) for p in people]),
+    }
+    story_inputs = []
+    for depth in DEPTHS:
+        cases[f"compatibility.{depth}"] = (
+            generate_mock_compatibility, [(u, c, depth) for u, c in chart_pairs],
+        )
+        story_inputs.extend(
+            (u, c, generate_mock_compatibility(u, c, depth), f"Contact {n}")
+            for n, (u, c) in enumerate(chart_pairs)
+        )
+    # All 720 category x sign pair stories fit the template cache
+    cases["story"] = (generate_mock_story, story_inputs)
+    cases["story.cold"] = (_cold_story, story_inputs)
+
+    days = [date(2001, 1, 1) + timedelta(days=d) for d in range(365)]
+    cases["get_sun_sign"] = (get_sun_sign, [(d,) for d in days])
+    cases["get_aspect"] = (get_aspect, [(s1, s2) for s1 in ALL_SIGNS for s2 in ALL_SIGNS])
+    return cases
+
+
+def measure_speed(func, inputs: list[tuple], min_time: float, repeat: int) -> float:
+    """Best ops/sec over `repeat` runs of at least `min_time` seconds each."""
+    for args in inputs:  # warm up
+        func(*args)
+    best = 0.0
+    for _ in range(repeat):
+        calls = 0
+        start = time.perf_counter()
+        while True:
+            for args in inputs:
+                func(*args)
+            calls += len(inputs)
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+        best = max(best, calls / elapsed)
+    return best
+
+
+def measure_allocations(func, inputs: list[tuple]) -> tuple[float, float]:
+    """Mean tracemalloc peak and retained bytes per call."""
+    peak_total = retained_total = 0
+    tracemalloc.start()
+    try:
+        for args in inputs:
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            result = func(*args)
+            current, peak = tracemalloc.get_traced_memory()
+            peak_total += peak - before
+            retained_total += current - before
+            del result
+    finally:
+        tracemalloc.stop()
+    return peak_total / len(inputs), retained_total / len(inputs)
+
+
+def run(name_filter: str | None, min_time: float, repeat: int) -> dict:
+    results = {}
+    for name, (func, inputs) in build_cases().items():
+        if name_filter and name_filter not in name:
+            continue
+        ops = measure_speed(func, inputs, min_time, repeat)
+        peak, retained = measure_allocations(func, inputs)
+        results[name] = {
+            "ops_per_sec": round(ops, 1),
+            "alloc_peak_bytes": round(peak, 1),
+            "alloc_retained_bytes": round(retained, 1),
+            "inputs": len(inputs),
+        }
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Human-readable regressions beyond `threshold` (a fraction, e.g. 0.15)."""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        slowdown = 1 - current["ops_per_sec"] / base["ops_per_sec"]
+        if slowdown > threshold:
+            regressions.append(
+                f"{name}: {current['ops_per_sec']:,.0f} ops/s vs {base['ops_per_sec']:,.0f} baseline "
+                f"({slowdown:.0%} slower)"
+            )
+        growth = current["alloc_peak_bytes"] - base["alloc_peak_bytes"]
+        if growth > ALLOC_SLACK_BYTES and growth > threshold * base["alloc_peak_bytes"]:
+            regressions.append(
+                f"{name}: {current['alloc_peak_bytes']:,.0f} B/call allocated vs "
+                f"{base['alloc_peak_bytes']:,.0f} baseline"
+            )
+    return regressions
+
+
+def print_table(results: dict, baseline: dict):
+    print(f"{'case':<34}{'ops/sec':>14}{'vs base':>9}{'peak B/call':>13}{'kept B/call':>13}")
+    for name, r in results.items():
+        base = baseline.get(name)
+        change = f"{r['ops_per_sec'] / base['ops_per_sec'] - 1:+.0%}" if base else ""
+        print(f"{name:<34}{r['ops_per_sec']:>14,.0f}{change:>9}"
+              f"{r['alloc_peak_bytes']:>13,.0f}{r['alloc_retained_bytes']:>13,.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument("--save", action="store_true", help="write these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="allowed regression as a fraction of the baseline (default 0.15)")
+    parser.add_argument("--filter", help="only run cases whose name contains this")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timing run")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs per case; the best is kept")
+    parser.add_argument("--output", help="also write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = run(args.filter, args.min_time, args.repeat)
+
+    baseline = {}
+    if not args.save and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)["cases"]
+    print_table(results, baseline)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"cases": results}, f, indent=2)
+
+    if args.save:
+        saved = {}
+        if args.filter and os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                saved = json.load(f)["cases"]
+        saved.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump({"python": sys.version.split()[0], "cases": saved}, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+        return
+
+    if not baseline:
+        print(f"No baseline at {args.baseline}; run with --save to record one")
+        return
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\nRegressions beyond {args.threshold:.0%}:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print(f"\nNo regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
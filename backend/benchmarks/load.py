@@ -0,0 +1,240 @@
+"""End-to-end load test of the API over ASGI, or against a local uvicorn.
+
+Run with: python -m benchmarks.load [--users 20] [--contacts 100] [--concurrency 10]
+                                    [--journeys 3] [--uvicorn] [--output report.json]
+
+Seeds a throwaway SQLite database (or --database-url) with users x contacts,
+then runs scripted journeys against the real app.main:app:
+
+    login -> contacts -> compatibility + story for a few contacts -> daily-forecast
+
+and prints requests/second and p50/p95/p99 latency per endpoint as JSON.
+Compatibilities and stories are computed on first view, so the first journey
+of each user also measures the cold path.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+import httpx
+
+JOURNEY = ["login", "contacts", "compatibility", "story", "daily-forecast"]
+
+
+class LatencyRecorder:
+    """Latencies and error counts per endpoint label."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def request(self, client: httpx.AsyncClient, label: str, method: str, url: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.latencies[label].append(time.perf_counter() - start)
+            self.errors[label] += 1
+            return None
+        self.latencies[label].append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            self.errors[label] += 1
+            return None
+        return response
+
+
+def percentile(ordered: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(values: list[float], errors: int, elapsed: float) -> dict:
+    ordered = sorted(values)
+    ms = lambda seconds: round(seconds * 1000, 2)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "rps": round(len(ordered) / elapsed, 1),
+        "mean_ms": ms(sum(ordered) / len(ordered)),
+        "p50_ms": ms(percentile(ordered, 50)),
+        "p95_ms": ms(percentile(ordered, 95)),
+        "p99_ms": ms(percentile(ordered, 99)),
+        "max_ms": ms(ordered[-1]),
+    }
+
+
+async def journey(client: httpx.AsyncClient, recorder: LatencyRecorder, email: str, password: str,
+                  rng: random.Random, views: int, page_size: int | None):
+    response = await recorder.request(
+        client, "POST /api/auth/login", "POST", "/api/auth/login",
+        json={"email": email, "password": password},
+    )
+    if response is None:
+        return
+    headers = {"Authorization": f"Bearer {response.json()['token']}"}
+
+    params = {"limit": page_size} if page_size else None
+    response = await recorder.request(client, "GET /api/contacts", "GET", "/api/contacts", headers=headers, params=params)
+    contacts = response.json() if response is not None else []
+
+    for contact in rng.sample(contacts, min(views, len(contacts))):
+        await recorder.request(
+            client, "GET /api/compatibility/{contact_id}", "GET", f"/api/compatibility/{contact['id']}", headers=headers,
+        )
+        await recorder.request(
+            client, "GET /api/stories/{contact_id}", "GET", f"/api/stories/{contact['id']}", headers=headers,
+        )
+
+    await recorder.request(
+        client, "GET /api/users/me/daily-forecast", "GET", "/api/users/me/daily-forecast", headers=headers,
+    )
+
+
+async def drive(client: httpx.AsyncClient, emails: list[str], args) -> dict:
+    from benchmarks.dataset import BENCH_PASSWORD
+
+    recorder = LatencyRecorder()
+    queue = asyncio.Queue()
+    for _ in range(args.journeys):
+        for email in emails:
+            queue.put_nowait(email)
+
+    async def virtual_user(worker: int):
+        rng = random.Random(args.seed + worker)
+        while not queue.empty():
+            email = queue.get_nowait()
+            await journey(client, recorder, email, BENCH_PASSWORD, rng, args.views, args.page_size)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(virtual_user(w) for w in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+
+    all_latencies = [v for values in recorder.latencies.values() for v in values]
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "total": summarize(all_latencies, sum(recorder.errors.values()), elapsed),
+        "endpoints": {
+            label: summarize(values, recorder.errors[label], elapsed)
+            for label, values in sorted(recorder.latencies.items())
+        },
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_until_up(base_url: str, server: subprocess.Popen, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+            try:
+                if (await client.get("/")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("uvicorn did not start in time")
+
+
+async def run(args) -> dict:
+    # Imported here so the environment set up in main() reaches app.config
+    from app.database import engine, migrate_db
+    from benchmarks.dataset import seed_database
+
+    setup_start = time.perf_counter()
+    await migrate_db()
+    emails = await seed_database(args.users, args.contacts)
+    setup = time.perf_counter() - setup_start
+
+    if args.uvicorn:
+        await engine.dispose()
+        port = _free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+             "--workers", str(args.workers), "--log-level", "warning"],
+            env={**os.environ, "DB_MIGRATE_ON_STARTUP": "false"},
+        )
+        try:
+            await _wait_until_up(base_url, server)
+            limits = httpx.Limits(max_connections=args.concurrency)
+            async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+                results = await drive(client, emails, args)
+        finally:
+            server.terminate()
+            server.wait()
+    else:
+        from app.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60.0) as client:
+            results = await drive(client, emails, args)
+        await engine.dispose()
+
+    return {
+        "config": {
+            "mode": f"uvicorn x{args.workers}" if args.uvicorn else "asgi",
+            "database": args.database_url.split(":", 1)[0],
+            "users": args.users,
+            "contacts_per_user": args.contacts,
+            "concurrency": args.concurrency,
+            "journeys_per_user": args.journeys,
+            "views_per_journey": args.views,
+            "page_size": args.page_size,
+            "password_hash_rounds": args.hash_rounds,
+            "journey": JOURNEY,
+        },
+        "setup_s": round(setup, 3),
+        **results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--contacts", type=int, default=100, help="contacts per user")
+    parser.add_argument("--concurrency", type=int, default=10, help="virtual users running journeys at once")
+    parser.add_argument("--journeys", type=int, default=3, help="journeys per user")
+    parser.add_argument("--views", type=int, default=3, help="contacts whose compatibility and story each journey opens")
+    parser.add_argument("--page-size", type=int, default=None, help="limit for the contacts list (default: whole circle)")
+    parser.add_argument("--hash-rounds", type=int, default=4,
+                        help="bcrypt rounds; production's 12 makes login dominate every journey")
+    parser.add_argument("--database-url", default=None, help="default: a new SQLite file in a temp directory")
+    parser.add_argument("--uvicorn", action="store_true", help="serve over a local uvicorn instead of in-process ASGI")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers (with --uvicorn)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    if args.database_url is None:
+        args.database_url = f"sqlite+aiosqlite:///{tempfile.mkdtemp(prefix='cosmic-load-')}/load.db"
+    os.environ.update({
+        "DATABASE_URL": args.database_url,
+        "PASSWORD_HASH_ROUNDS": str(args.hash_rounds),
+        "SEED_ON_STARTUP": "false",
+    })
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
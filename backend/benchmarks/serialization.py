@@ -0,0 +1,90 @@
+"""Per-request CPU of the contacts list response path, old vs single-pass.
+
+Run with: python -m benchmarks.serialization [--contacts 200] [--requests 300]
+
+Serves one page of contacts with full natal charts through three otherwise
+identical routes, in-process over ASGI (no database, no network):
+
+  stdlib   - ContactResponse models re-validated against response_model,
+             rendered with JSONResponse (the path on older FastAPI releases)
+  pydantic - the same double validation, dumped by pydantic's dump_json
+             (the previous code path on current FastAPI)
+  single   - app.responses.model_response: validate once, encode with orjson
+"""
+import argparse
+import asyncio
+import json
+import time
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from app.responses import ORJSONResponse, model_response
+from app.schemas.contact import ContactResponse
+from benchmarks.dataset import make_contacts
+
+
+def build_app(contacts: list[dict]) -> FastAPI:
+    app = FastAPI(default_response_class=ORJSONResponse)
+
+    @app.get("/stdlib", response_model=list[ContactResponse], response_class=JSONResponse)
+    async def stdlib():
+        return [ContactResponse(**c) for c in contacts]
+
+    # No response_class here or in the app, so FastAPI takes its dump_json path
+    pydantic_app = FastAPI()
+
+    @pydantic_app.get("/pydantic", response_model=list[ContactResponse])
+    async def pydantic():
+        return [ContactResponse(**c) for c in contacts]
+
+    @app.get("/single", response_model=list[ContactResponse])
+    async def single():
+        return model_response(list[ContactResponse], contacts)
+
+    app.mount("/p", pydantic_app)
+    return app
+
+
+async def measure(client: httpx.AsyncClient, path: str, requests: int) -> tuple[float, float, bytes]:
+    body = (await client.get(path)).content  # warm up adapters and caches
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    for _ in range(requests):
+        response = await client.get(path)
+        response.raise_for_status()
+    cpu = (time.process_time() - cpu_start) / requests
+    wall = (time.perf_counter() - wall_start) / requests
+    return cpu, wall, body
+
+
+async def run(contacts: int, requests: int):
+    app = build_app(make_contacts(contacts, user_id="bench-user"))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        results = {
+            "stdlib": await measure(client, "/stdlib", requests),
+            "pydantic": await measure(client, "/p/pydantic", requests),
+            "single": await measure(client, "/single", requests),
+        }
+
+    reference = json.loads(results["stdlib"][2])
+    for name, (_, _, body) in results.items():
+        assert json.loads(body) == reference, f"{name} response differs from stdlib"
+
+    print(f"Contacts list, {contacts} contacts with full charts ({len(results['single'][2]) / 1024:.0f} KiB), {requests} requests each")
+    print(f"{'path':<10}{'cpu ms/req':>12}{'wall ms/req':>13}{'cpu saved':>11}")
+    single_cpu = results["single"][0]
+    for name, (cpu, wall, _) in results.items():
+        saved = "" if name == "single" else f"{(cpu - single_cpu) * 1000:.2f} ms"
+        print(f"{name:<10}{cpu * 1000:>12.2f}{wall * 1000:>13.2f}{saved:>11}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--contacts", type=int, default=200, help="contacts per response (the list page limit is 200)")
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+    asyncio.run(run(args.contacts, args.requests))
+
+
+if __name__ == "__main__":
+    main()